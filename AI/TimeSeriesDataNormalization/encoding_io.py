@@ -0,0 +1,146 @@
+import os
+import numpy as np
+
+# -----------------------------
+# Column layout of the time encoding table
+# -----------------------------
+COLUMNS = ["day", "minute", "day_sin", "day_cos", "time_sin", "time_cos", "normalized_value"]
+# second-resolution tables have a "second" column in place of "minute"
+INT_COLUMNS = {"day": np.int16, "minute": np.int16, "second": np.int32}
+
+
+def _prepare(columns, float32=False):
+    """
+      Description: Flatten columns and pick compact dtypes (int16 day/minute, int32 second, float32 on request).
+      Args:
+        - columns | dict of column name -> numpy.array
+        - float32 | Boolean
+
+      Returns:
+        - prepared | dict of column name -> 1D numpy.array
+    """
+    prepared = {}
+    for name, values in columns.items():
+        values = np.asarray(values).ravel()
+        if name in INT_COLUMNS:
+            values = values.astype(INT_COLUMNS[name])
+        elif float32:
+            values = values.astype(np.float32)
+        prepared[name] = values
+    return prepared
+
+
+def write_csv(path, columns, float_precision=None, chunk_rows=65536):
+    """
+      Description: Write equally sized 1D arrays as CSV columns, formatting a block of rows at a time
+                   instead of calling csv.writer.writerow per row.
+      Args:
+        - path | String
+        - columns | dict of column name -> numpy.array (integer or float)
+        - float_precision | Number of decimal places for float columns, None for full (round-trip) precision
+        - chunk_rows | Number of rows formatted per write
+
+      Returns:
+        - rows_written | Number
+    """
+    names = list(columns)
+    arrays = [np.asarray(columns[name]).ravel() for name in names]
+    float_fmt = "%r" if float_precision is None else f"%.{float_precision}f"
+    row_fmt = ",".join("%d" if np.issubdtype(a.dtype, np.integer) else float_fmt for a in arrays) + "\n"
+    n_rows = len(arrays[0])
+
+    with open(path, mode='w', newline='') as f:
+        f.write(",".join(names) + "\n")
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(start + chunk_rows, n_rows)
+            # tolist() converts a whole block to Python scalars in C, then one string is built per block
+            rows = zip(*(a[start:stop].tolist() for a in arrays))
+            f.write("".join(row_fmt % row for row in rows))
+    return n_rows
+
+
+def write_npy(directory, columns, float32=False):
+    """
+      Description: Write one memory-mappable .npy file per column into a directory.
+      Args:
+        - directory | String
+        - columns | dict of column name -> numpy.array
+        - float32 | Boolean, store float columns as float32 to halve their size
+
+      Returns:
+        - directory | String
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name, values in _prepare(columns, float32).items():
+        np.save(os.path.join(directory, f"{name}.npy"), values)
+    return directory
+
+
+def write_parquet(path, columns, float32=False):
+    """
+      Description: Write the columns as a single Parquet file. Needs pandas with pyarrow or fastparquet.
+      Args:
+        - path | String
+        - columns | dict of column name -> numpy.array
+        - float32 | Boolean
+
+      Returns:
+        - path | String
+    """
+    import pandas as pd
+    pd.DataFrame(_prepare(columns, float32)).to_parquet(path, index=False)
+    return path
+
+
+def resolve_encoding_path(stem):
+    """
+      Description: Find the most compact available copy of an encoding table.
+                   Looks for the .npy directory first, then .parquet, then .csv.
+      Args:
+        - stem | String, path without extension, e.g. "data/time_encoding"
+
+      Returns:
+        - path | String, or None when no copy exists
+    """
+    for path in (stem, stem + ".parquet", stem + ".csv"):
+        if os.path.isdir(path) and os.path.exists(os.path.join(path, f"{COLUMNS[0]}.npy")):
+            return path
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def load_encoding(path, columns=None, mmap=True, as_frame=False):
+    """
+      Description: Load an encoding table written as a .npy directory, .parquet or .csv file.
+      Args:
+        - path | String
+        - columns | list of column names to load, defaults to every column in the table
+        - mmap | Boolean, memory-map .npy columns instead of reading them
+        - as_frame | Boolean, return a pandas.DataFrame instead of a dict of arrays
+
+      Returns:
+        - table | dict of column name -> numpy.array, or pandas.DataFrame
+    """
+    if os.path.isdir(path):
+        if columns is None:
+            available = [name for name in COLUMNS + ["second"] if os.path.exists(os.path.join(path, f"{name}.npy"))]
+            columns = sorted(available, key=lambda name: COLUMNS.index("minute" if name == "second" else name))
+        table = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+                 for name in columns}
+    else:
+        import pandas as pd
+        if path.endswith(".parquet"):
+            df = pd.read_parquet(path, columns=columns)
+        else:
+            df = pd.read_csv(path, usecols=columns)
+        if columns is not None:
+            df = df[list(columns)]
+        if as_frame:
+            return df
+        table = {name: df[name].to_numpy() for name in df.columns}
+
+    if as_frame:
+        import pandas as pd
+        return pd.DataFrame(table, copy=False)
+    return table
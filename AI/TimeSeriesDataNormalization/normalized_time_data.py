@@ -1,100 +1,199 @@
+import argparse
+import calendar
+import math
+import os
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-import csv
+from encoding_io import write_csv, write_npy, write_parquet
+from time_features import MINUTES_PER_DAY, encode_day_minute
 
 # -----------------------------
-# Parameters
+# Defaults
 # -----------------------------
-graph_type = "2D"  # "2D" or "3D"
-csv_output = True   # Set to True to save CSV
-output_file = "time_encoding.csv"
+RESOLUTIONS = ["seconds", "minutes", "hours"]
+FORMATS = ["csv", "npy", "parquet"]
+DEFAULT_OUTPUT = "time_encoding"
 
-days = np.arange(1, 366)             # Days 1–365
-minutes_in_day = np.arange(0, 24*60, 1)  # 1-minute intervals
 
-# -----------------------------
-# Meshgrid for day × minute
-# -----------------------------
-day_grid, minute_grid = np.meshgrid(days, minutes_in_day, indexing='ij')
+def generate(resolution="minutes", year_days=365):
+    """
+      Description: Build the day x time-of-day encoding grid.
+      Args:
+        - resolution | "seconds", "minutes" or "hours"
+        - year_days | Number of days to include, 366 to cover leap years
 
-# -----------------------------
-# Cyclical encodings
-# -----------------------------
-day_sin = np.sin(2 * np.pi * day_grid / 365)
-day_cos = np.cos(2 * np.pi * day_grid / 365)
-time_sin = np.sin(2 * np.pi * minute_grid / 1440)
-time_cos = np.cos(2 * np.pi * minute_grid / 1440)
+      Returns:
+        - columns | dict of 2D numpy.array (days x time steps). The time column is "second" of day
+                    for second resolution and "minute" of day otherwise, so hourly tables keep the
+                    (day, minute) key of the minute table.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {RESOLUTIONS}")
+    days = np.arange(1, year_days + 1)
+    if resolution == "seconds":
+        time_col = "second"
+        time_of_day = np.arange(0, MINUTES_PER_DAY * 60)
+    else:
+        time_col = "minute"
+        time_of_day = np.arange(0, MINUTES_PER_DAY, 60 if resolution == "hours" else 1)
 
-# -----------------------------
-# Unique scalar per (day, minute)
-# -----------------------------
-combined_value = day_sin + day_cos + time_sin + time_cos
-normalized_value = (combined_value - combined_value.min()) / (combined_value.max() - combined_value.min())
+    day_grid, time_grid = np.meshgrid(days, time_of_day, indexing='ij')
+    minute_grid = time_grid / 60 if resolution == "seconds" else time_grid
+    # shared with time_features.encode_time so on-demand encodings match the table
+    encoding = encode_day_minute(day_grid, minute_grid)
+    encoding.pop("minute")
+    return {"day": encoding.pop("day"), time_col: time_grid, **encoding}
 
-# -----------------------------
-# Convert minutes to hours for plotting
-# -----------------------------
-time_hours = minute_grid / 60
 
-# -----------------------------
-# CSV Export
-# -----------------------------
-if csv_output:
-    print(f"Saving dataset to {output_file} ...")
-    # Flatten all arrays to 1D
-    day_flat = day_grid.flatten()
-    minute_flat = minute_grid.flatten()
-    day_sin_flat = day_sin.flatten()
-    day_cos_flat = day_cos.flatten()
-    time_sin_flat = time_sin.flatten()
-    time_cos_flat = time_cos.flatten()
-    normalized_flat = normalized_value.flatten()
-
-    # Write to CSV
-    with open(output_file, mode='w', newline='') as f:
-        writer = csv.writer(f)
-        # Header
-        writer.writerow(["day", "minute", "day_sin", "day_cos", "time_sin", "time_cos", "normalized_value"])
-        # Data
-        for i in range(len(day_flat)):
-            writer.writerow([day_flat[i], minute_flat[i], day_sin_flat[i], day_cos_flat[i],
-                             time_sin_flat[i], time_cos_flat[i], normalized_flat[i]])
-    print("CSV saved successfully!")
+def export(columns, output=DEFAULT_OUTPUT, formats=("csv", "npy"), float32=False, float_precision=None):
+    """
+      Description: Write the encoding table in each requested format.
+      Args:
+        - columns | dict returned by generate
+        - output | String, path without extension (.csv / .parquet are appended, npy uses it as a directory)
+        - formats | list of "csv", "npy", "parquet"
+        - float32 | Boolean, store float columns as float32 in the binary formats
+        - float_precision | Number of decimal places for CSV floats, None keeps full precision
 
-# -----------------------------
-# Plotting
-# -----------------------------
-if graph_type.upper() == "2D":
-    plt.figure(figsize=(14, 6))
-    plt.imshow(normalized_value, aspect='auto', cmap='viridis', origin='lower')
-    plt.colorbar(label='Normalized Unique Value')
-    plt.xlabel('Minute of Day Index')
-    plt.ylabel('Day of Year')
-    plt.title('Unique Scalar per Day and Minute of the Year (2D Heatmap)')
-    plt.show()
-
-elif graph_type.upper() == "3D":
-    fig = plt.figure(figsize=(16, 8))
-    ax = fig.add_subplot(111, projection='3d')
-
-    # Use rstride/cstride to speed up plotting without losing data
-    surf = ax.plot_surface(
-        time_hours, day_grid, normalized_value,
-        rstride=10, cstride=10,  # adjust for speed vs smoothness
-        cmap='plasma', edgecolor='none', alpha=0.95
-    )
-
-    ax.set_xlabel('Time of Day (hours)')
-    ax.set_ylabel('Day of Year')
-    ax.set_zlabel('Normalized Unique Value')
-    ax.set_title('3D Visualization of Combined Daily and Yearly Cycles')
-    fig.colorbar(surf, shrink=0.5, aspect=10, label='Normalized Unique Value')
-
-    # Optional: better viewing angle
-    ax.view_init(elev=30, azim=-60)
-
-    plt.show()
-
-else:
-    print("Invalid graph_type! Choose '2D' or '3D'.")
+      Returns:
+        - paths | list of written paths
+    """
+    paths = []
+    if "csv" in formats:
+        print(f"Saving dataset to {output}.csv ...")
+        write_csv(output + ".csv", columns, float_precision)
+        print("CSV saved successfully!")
+        paths.append(output + ".csv")
+    if "npy" in formats:
+        print(f"Saving .npy columns to {output}/ ...")
+        paths.append(write_npy(output, columns, float32))
+    if "parquet" in formats:
+        print(f"Saving dataset to {output}.parquet ...")
+        paths.append(write_parquet(output + ".parquet", columns, float32))
+    return paths
+
+
+def block_average(array, max_cells):
+    """
+      Description: Downsample a 2D grid by averaging equal blocks until it has at most max_cells cells.
+      Args:
+        - array | 2D numpy.array
+        - max_cells | Number, cell budget of the result, at least 1
+
+      Returns:
+        - downsampled | 2D numpy.array (the input itself when it already fits)
+    """
+    if max_cells < 1:
+        raise ValueError(f"max_cells must be at least 1, got {max_cells}")
+    rows, cols = array.shape
+    # sqrt(rows*cols/max_cells) is a lower bound; partial edge blocks may need a step or two more
+    factor = max(1, math.ceil(math.sqrt(rows * cols / max_cells)))
+    while -(-rows // factor) * -(-cols // factor) > max_cells:
+        factor += 1
+    if factor == 1:
+        return array
+    # pad with edge values so the last partial block averages real data only
+    padded = np.pad(array, ((0, -rows % factor), (0, -cols % factor)), mode='edge')
+    return padded.reshape(padded.shape[0] // factor, factor, padded.shape[1] // factor, factor).mean(axis=(1, 3))
+
+
+def plot(columns, graph_type="2D", output=None, max_cells=None):
+    """
+      Description: Draw the normalized value as a 2D heatmap or 3D surface. matplotlib is only imported here.
+      Args:
+        - columns | dict returned by generate
+        - graph_type | "2D" or "3D"
+        - output | String, save the figure as a PNG through the Agg backend instead of showing it
+        - max_cells | Number, block-average the grid down to this many cells before drawing
+                      (defaults to 200,000 for 2D and 10,000 for 3D)
+
+      Returns:
+        - None
+    """
+    import matplotlib
+    if output:
+        # headless: render straight to file without needing a display
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    if graph_type.upper() not in ("2D", "3D"):
+        print("Invalid graph_type! Choose '2D' or '3D'.")
+        return
+    if max_cells is None:
+        max_cells = 200_000 if graph_type.upper() == "2D" else 10_000
+
+    # Convert time of day to hours for plotting
+    time_hours = columns["second"] / 3600 if "second" in columns else columns["minute"] / 60
+    day_grid = block_average(columns["day"], max_cells)
+    time_hours = block_average(time_hours, max_cells)
+    normalized_value = block_average(columns["normalized_value"], max_cells)
+
+    if graph_type.upper() == "2D":
+        fig = plt.figure(figsize=(14, 6))
+        plt.imshow(normalized_value, aspect='auto', cmap='viridis', origin='lower',
+                   extent=[0, 24, columns["day"][0, 0], columns["day"][-1, 0]])
+        plt.colorbar(label='Normalized Unique Value')
+        plt.xlabel('Time of Day (hours)')
+        plt.ylabel('Day of Year')
+        plt.title('Unique Scalar per Day and Time of the Year (2D Heatmap)')
+
+    else:
+        fig = plt.figure(figsize=(16, 8))
+        ax = fig.add_subplot(111, projection='3d')
+
+        # the grid is already decimated to the cell budget, so draw every remaining cell
+        surf = ax.plot_surface(
+            time_hours, day_grid, normalized_value,
+            rstride=1, cstride=1,
+            cmap='plasma', edgecolor='none', alpha=0.95
+        )
+
+        ax.set_xlabel('Time of Day (hours)')
+        ax.set_ylabel('Day of Year')
+        ax.set_zlabel('Normalized Unique Value')
+        ax.set_title('3D Visualization of Combined Daily and Yearly Cycles')
+        fig.colorbar(surf, shrink=0.5, aspect=10, label='Normalized Unique Value')
+
+        # Optional: better viewing angle
+        ax.view_init(elev=30, azim=-60)
+
+    if output:
+        fig.savefig(output, dpi=100, bbox_inches='tight')
+        plt.close(fig)
+        print(f"Saved {output}")
+    else:
+        plt.show()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the cyclical day/time-of-day encoding table.")
+    parser.add_argument("--resolution", choices=RESOLUTIONS, default="minutes", help="time-of-day step")
+    year = parser.add_mutually_exclusive_group()
+    year.add_argument("--year-days", type=int, choices=[365, 366], default=None, help="days to generate")
+    year.add_argument("--year", type=int, help="generate 366 days if this calendar year is a leap year")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["csv", "npy"], help="output formats")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="output path without extension")
+    parser.add_argument("--float32", action="store_true", help="store floats as float32 in npy/parquet output")
+    parser.add_argument("--float-precision", type=int, default=None, help="decimal places for CSV floats")
+    parser.add_argument("--graph", nargs="+", choices=["2D", "3D", "none"], default=["2D"], help="plots to draw after generating")
+    parser.add_argument("--headless", action="store_true",
+                        help="save 2d_normalized_data.png / 3d_normalized_data.png with the Agg backend instead of showing")
+    parser.add_argument("--image-dir", default=".", help="directory for --headless images")
+    parser.add_argument("--max-cells", type=int, default=None, help="cell budget the plotted grid is block-averaged to")
+    args = parser.parse_args(argv)
+    if args.max_cells is not None and args.max_cells < 1:
+        parser.error("--max-cells must be at least 1")
+
+    year_days = args.year_days or (366 if args.year and calendar.isleap(args.year) else 365)
+    columns = generate(args.resolution, year_days)
+    export(columns, args.output, args.format, args.float32, args.float_precision)
+    for graph_type in args.graph:
+        if graph_type == "none":
+            continue
+        output = None
+        if args.headless:
+            output = os.path.join(args.image_dir, f"{graph_type.lower()}_normalized_data.png")
+        plot(columns, graph_type, output, args.max_cells)
+
+
+if __name__ == "__main__":
+    main()
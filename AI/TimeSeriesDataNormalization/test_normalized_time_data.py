@@ -1,17 +1,21 @@
 import pytest
-import pandas as pd
 import os
+from validation import validate_encoding
 
 csv_file = "time_encoding.csv"
+npy_dir = "time_encoding"
+parquet_file = "time_encoding.parquet"
 
 # -----------------------------
-# Fixture to load CSV once
+# Fixture to stream-validate each available output format once
 # -----------------------------
-@pytest.fixture(scope="module")
-def df():
-    if not os.path.exists(csv_file):
-        pytest.skip(f"{csv_file} does not exist, skipping tests.")
-    return pd.read_csv(csv_file)
+@pytest.fixture(scope="module", params=[csv_file, npy_dir, parquet_file])
+def report(request):
+    if not os.path.exists(request.param):
+        pytest.skip(f"{request.param} does not exist, skipping tests.")
+    if request.param == parquet_file:
+        pytest.importorskip("pyarrow")
+    return validate_encoding(request.param)
 
 # -----------------------------
 # Tests
@@ -20,32 +24,64 @@ def df():
 def test_csv_exists():
     assert os.path.exists(csv_file), f"{csv_file} does not exist!"
 
-def test_csv_columns(df):
+def test_csv_columns(report):
     expected_columns = ["day", "minute", "day_sin", "day_cos", "time_sin", "time_cos", "normalized_value"]
-    assert list(df.columns) == expected_columns
+    assert report.columns == expected_columns
 
-def check_for_duplicates(df):
-    """Return 1 if no duplicate rows, 0 otherwise."""
-    duplicates = df[df.duplicated(keep=False)]
-    return 1 if duplicates.empty else 0
+def test_csv_output(report):
+    # every check passes together: columns, row count, ranges and keys
+    assert report.ok, str(report)
 
-def test_csv_output(df):
-    assert check_for_duplicates(df) == 1
+def test_value_ranges(report):
+    # cyclical features within [-1, 1], normalized_value within [0, 1]
+    assert report.out_of_range == {}
 
-def test_value_ranges(df):
-    # Check cyclical features are within [-1, 1]
-    for col in ["day_sin", "day_cos", "time_sin", "time_cos"]:
-        assert df[col].between(-1, 1).all()
-    # Check normalized_value is within [0, 1]
-    assert df["normalized_value"].between(0, 1).all()
-
-def test_row_count(df):
+def test_row_count(report):
     # Ensure exactly 365 days × 1440 minutes
-    assert len(df) == 365 * 1440
+    assert report.rows == 365 * 1440
+
+def test_unique_day_minute(report):
+    # Ensure no duplicate or out-of-table day/minute combinations (which also rules out duplicate rows)
+    assert report.duplicate_keys == 0
+    assert report.invalid_keys == 0
+
+def test_generate_hourly_leap_year():
+    from normalized_time_data import generate
+    columns = generate("hours", year_days=366)
+    assert columns["day"].shape == (366, 24)
+    assert columns["minute"][0].tolist() == list(range(0, 1440, 60))
+
+def test_generate_matches_minute_table():
+    from normalized_time_data import generate
+    hourly = generate("hours")
+    minutely = generate("minutes")
+    assert (hourly["normalized_value"] == minutely["normalized_value"][:, ::60]).all()
+
+def test_generate_seconds_column():
+    from normalized_time_data import generate
+    columns = generate("seconds", year_days=1)
+    assert "second" in columns and "minute" not in columns
+    assert columns["second"].shape == (1, 86400)
+
+def test_block_average():
+    import numpy as np
+    from normalized_time_data import block_average
+    grid = np.arange(365 * 1440, dtype=float).reshape(365, 1440)
+    small = block_average(grid, 10_000)
+    assert small.size <= 10_000
+    # 8x8 blocks are the smallest that fit 365x1440 into 10,000 cells
+    assert small.shape == (46, 180)
+    assert small[0, 0] == grid[:8, :8].mean()
+    assert block_average(grid[:, :24], 10_000).shape == (365, 24)
+    assert block_average(grid, 1).shape == (1, 1)
 
-def test_unique_day_minute(df):
-    # Ensure no duplicate day/minute combinations
-    assert df.duplicated(subset=["day", "minute"]).sum() == 0
+def test_block_average_rejects_empty_budget():
+    import numpy as np
+    from normalized_time_data import block_average, main
+    with pytest.raises(ValueError):
+        block_average(np.zeros((4, 4)), 0)
+    with pytest.raises(SystemExit):
+        main(["--graph", "none", "--format", "csv", "--max-cells", "0"])
 
 # -----------------------------
 # Allow direct execution
@@ -0,0 +1,85 @@
+import pytest
+import numpy as np
+from encoding_io import load_encoding, resolve_encoding_path
+from time_features import encode_day_minute, encode_time
+
+timestamps = np.array(["2012-01-01T00:00", "2012-03-01T13:37", "2012-12-31T23:59", "2013-07-04T06:00"],
+                      dtype="datetime64[m]")
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_day_and_minute():
+    encoding = encode_time(timestamps)
+    # 2012 is a leap year, so Dec 31 is day 366
+    assert encoding["day"].tolist() == [1, 61, 366, 185]
+    assert encoding["minute"].tolist() == [0, 13 * 60 + 37, 1439, 360]
+
+def test_accepts_python_datetimes():
+    from datetime import datetime
+    encoding = encode_time([datetime(2012, 1, 1, 1, 0)])
+    assert encoding["day"].tolist() == [1]
+    assert encoding["minute"].tolist() == [60]
+
+def test_rejects_nat():
+    with pytest.raises(ValueError):
+        encode_time(np.array(["2012-01-01T00:00", "NaT"], dtype="datetime64[m]"))
+
+def test_value_ranges():
+    encoding = encode_time(timestamps)
+    for col in ["day_sin", "day_cos", "time_sin", "time_cos"]:
+        assert np.all(np.abs(encoding[col]) <= 1)
+    assert np.all((encoding["normalized_value"] >= 0) & (encoding["normalized_value"] <= 1))
+
+def test_matches_encoding_table():
+    path = resolve_encoding_path("time_encoding")
+    if path is None:
+        pytest.skip("time_encoding table does not exist, skipping comparison.")
+    table = load_encoding(path)
+    day = np.array([1, 100, 200, 365])
+    minute = np.array([0, 720, 61, 1439])
+    rows = (day - 1) * 1440 + minute
+    encoding = encode_day_minute(day, minute)
+    for col in ["day_sin", "day_cos", "time_sin", "time_cos", "normalized_value"]:
+        expected = np.asarray(table[col][rows])
+        np.testing.assert_allclose(encoding[col], expected, rtol=0, atol=1e-7 if expected.dtype == np.float32 else 0)
+
+def test_lookup_matches_encode_time():
+    from normalized_time_data import generate
+    from time_features import lookup_encoding
+    table = {name: values.ravel() for name, values in generate("minutes", year_days=366).items()}
+    encoding = encode_time(timestamps)
+    looked_up = lookup_encoding(table, timestamps)
+    for col in ["day", "minute", "day_sin", "day_cos", "time_sin", "time_cos", "normalized_value"]:
+        np.testing.assert_allclose(looked_up[col], encoding[col])
+
+def test_lookup_rejects_short_table():
+    from normalized_time_data import generate
+    from time_features import lookup_encoding
+    table = {name: values.ravel() for name, values in generate("minutes", year_days=365).items()}
+    with pytest.raises(ValueError):
+        lookup_encoding(table, timestamps)
+
+def test_lookup_hourly_table():
+    from normalized_time_data import generate
+    from time_features import lookup_encoding
+    table = {name: values.ravel() for name, values in generate("hours", year_days=366).items()}
+    hourly = np.array(["2012-01-01T01:00", "2012-01-07T13:00", "2012-12-31T23:00"], dtype="datetime64[m]")
+    looked_up = lookup_encoding(table, hourly)
+    np.testing.assert_allclose(looked_up["normalized_value"], encode_time(hourly)["normalized_value"])
+    with pytest.raises(ValueError):
+        lookup_encoding(table, np.array(["2012-01-01T01:30"], dtype="datetime64[m]"))
+
+def test_lookup_rejects_seconds_table():
+    from normalized_time_data import generate
+    from time_features import lookup_encoding
+    table = {name: values.ravel() for name, values in generate("seconds", year_days=1).items()}
+    with pytest.raises(ValueError):
+        lookup_encoding(table, timestamps[:1])
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
@@ -0,0 +1,51 @@
+import pytest
+from encoding_io import write_csv, write_npy
+from normalized_time_data import generate
+from validation import validate_encoding
+
+# -----------------------------
+# Fixture with a small two-day table
+# -----------------------------
+@pytest.fixture
+def columns():
+    return generate("minutes", year_days=2)
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_valid_table(tmp_path, columns):
+    path = write_npy(str(tmp_path / "encoding"), columns)
+    report = validate_encoding(path, days=2, chunk_rows=1000)
+    assert report.ok
+    assert report.rows == 2 * 1440
+
+def test_duplicate_across_chunks(tmp_path, columns):
+    # repeat day 1 minute 0 at the very end so the repeat lands in a later block
+    columns["minute"][1, -1] = 0
+    columns["day"][1, -1] = 1
+    path = write_npy(str(tmp_path / "encoding"), columns)
+    report = validate_encoding(path, days=2, chunk_rows=1000)
+    assert report.duplicate_keys == 1
+    assert not report.ok
+
+def test_out_of_range_and_invalid_keys(tmp_path, columns):
+    columns["normalized_value"][0, :3] = 1.5
+    columns["day"][0, 0] = 3
+    path = write_npy(str(tmp_path / "encoding"), columns)
+    report = validate_encoding(path, days=2)
+    assert report.out_of_range == {"normalized_value": 3}
+    assert report.invalid_keys == 1
+
+def test_csv_matches_npy(tmp_path, columns):
+    pytest.importorskip("pandas")
+    path = str(tmp_path / "encoding.csv")
+    write_csv(path, columns)
+    report = validate_encoding(path, days=2, chunk_rows=500)
+    assert report.ok
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
@@ -0,0 +1,139 @@
+from functools import lru_cache
+import numpy as np
+
+# -----------------------------
+# Cycle lengths used by the encoding table
+# -----------------------------
+DAYS_PER_YEAR = 365
+MINUTES_PER_DAY = 24 * 60
+
+
+def cyclical_features(day, minute):
+    """
+      Description: Sin/cos encode day of year and minute of day.
+      Args:
+        - day | numpy.array of day of year (1-based)
+        - minute | numpy.array of minute of day (0-1439)
+
+      Returns:
+        - features | dict with day_sin, day_cos, time_sin, time_cos arrays
+    """
+    return {
+        "day_sin": np.sin(2 * np.pi * day / DAYS_PER_YEAR),
+        "day_cos": np.cos(2 * np.pi * day / DAYS_PER_YEAR),
+        "time_sin": np.sin(2 * np.pi * minute / MINUTES_PER_DAY),
+        "time_cos": np.cos(2 * np.pi * minute / MINUTES_PER_DAY),
+    }
+
+
+def _combined(features):
+    return features["day_sin"] + features["day_cos"] + features["time_sin"] + features["time_cos"]
+
+
+@lru_cache(maxsize=1)
+def reference_range():
+    """
+      Description: Min and max of the combined value over the full 365 day x 1440 minute table.
+                   normalized_value is scaled with these so every consumer matches time_encoding.csv.
+      Args:
+        - None
+
+      Returns:
+        - (min, max) | tuple of floats
+    """
+    day_grid, minute_grid = np.meshgrid(np.arange(1, DAYS_PER_YEAR + 1), np.arange(0, MINUTES_PER_DAY),
+                                        indexing='ij')
+    combined = _combined(cyclical_features(day_grid, minute_grid))
+    return combined.min(), combined.max()
+
+
+def encode_day_minute(day, minute):
+    """
+      Description: Compute the full encoding (the columns of time_encoding.csv) for day/minute arrays.
+      Args:
+        - day | numpy.array of day of year (1-based, 366 allowed for leap years)
+        - minute | numpy.array of minute of day (0-1439)
+
+      Returns:
+        - encoding | dict with day, minute, day_sin, day_cos, time_sin, time_cos, normalized_value arrays
+    """
+    features = cyclical_features(day, minute)
+    low, high = reference_range()
+    normalized_value = (_combined(features) - low) / (high - low)
+    return {"day": day, "minute": minute, **features, "normalized_value": normalized_value}
+
+
+def day_and_minute(timestamps):
+    """
+      Description: Vectorized day of year and minute of day for an array of timestamps.
+      Args:
+        - timestamps | array-like of datetimes (numpy datetime64, pandas Series/DatetimeIndex or datetime objects)
+
+      Returns:
+        - (day, minute) | tuple of int64 numpy.array, day is 1-based
+
+      Raises:
+        - ValueError | when any timestamp is NaT
+    """
+    ts = np.asarray(timestamps, dtype="datetime64[m]")
+    if np.isnat(ts).any():
+        # NaT would turn into a huge negative day and a finite, meaningless encoding
+        raise ValueError(f"{int(np.isnat(ts).sum())} timestamps are missing (NaT)")
+    dates = ts.astype("datetime64[D]")
+    day = (dates - dates.astype("datetime64[Y]")).astype(np.int64) + 1
+    minute = (ts - dates).astype(np.int64)
+    return day, minute
+
+
+def encode_time(timestamps):
+    """
+      Description: Vectorized time encoding computed directly from timestamps, replacing the join
+                   against the precomputed time_encoding table.
+      Args:
+        - timestamps | array-like of datetimes (numpy datetime64, pandas Series/DatetimeIndex or datetime objects)
+
+      Returns:
+        - encoding | dict with day, minute, day_sin, day_cos, time_sin, time_cos, normalized_value arrays
+    """
+    return encode_day_minute(*day_and_minute(timestamps))
+
+
+def lookup_encoding(table, timestamps):
+    """
+      Description: Look the encoding up in a minute- or hour-resolution table by direct row indexing on
+                   (day-1)*steps_per_day + minute//step, an O(n) gather in place of a hash join.
+      Args:
+        - table | dict of column name -> numpy.array as returned by encoding_io.load_encoding
+        - timestamps | array-like of datetimes
+
+      Returns:
+        - encoding | dict with day, minute and the table's feature columns
+
+      Raises:
+        - ValueError | for second-resolution tables, NaT timestamps, or timestamps that fall
+                       between the table's time steps or past its last day
+    """
+    if "minute" not in table:
+        raise ValueError("lookup_encoding needs a table with a minute column (second-resolution tables are not supported)")
+    table_day = np.asarray(table["day"])
+    table_minute = np.asarray(table["minute"])
+    # rows are ordered day-major, so the first day's rows give the time grid
+    steps_per_day = int(np.searchsorted(table_day, table_day[0], side="right"))
+    step = MINUTES_PER_DAY // steps_per_day
+    if step * steps_per_day != MINUTES_PER_DAY or not np.array_equal(table_minute[:steps_per_day],
+                                                                    np.arange(0, MINUTES_PER_DAY, step)):
+        raise ValueError("table rows are not an evenly spaced day x minute grid")
+
+    day, minute = day_and_minute(timestamps)
+    if np.any(minute % step):
+        raise ValueError(f"timestamps must fall on the table's {step}-minute grid")
+    rows = (day - 1) * steps_per_day + minute // step
+    n_rows = len(table_day)
+    if rows.size and (rows.min() < 0 or rows.max() >= n_rows):
+        raise ValueError(f"timestamps reach day {day.max()} but the table only has {n_rows // steps_per_day} days "
+                         "(regenerate it with --year-days 366 for leap years)")
+    encoding = {"day": day, "minute": minute}
+    for name, values in table.items():
+        if name not in encoding:
+            encoding[name] = np.asarray(values)[rows]
+    return encoding
@@ -0,0 +1,135 @@
+import argparse
+import os
+import sys
+import numpy as np
+from encoding_io import COLUMNS
+
+# -----------------------------
+# Expected value ranges
+# -----------------------------
+RANGES = {
+    "day_sin": (-1, 1),
+    "day_cos": (-1, 1),
+    "time_sin": (-1, 1),
+    "time_cos": (-1, 1),
+    "normalized_value": (0, 1),
+}
+
+
+class ValidationReport:
+    def __init__(self):
+        self.columns = []
+        self.rows = 0
+        self.expected_rows = 0
+        self.out_of_range = {}      # column -> number of rows outside RANGES
+        self.invalid_keys = 0       # rows whose day/minute fall outside the table
+        self.duplicate_keys = 0     # rows repeating an earlier (day, minute)
+
+    @property
+    def ok(self):
+        return (self.columns == COLUMNS and self.rows == self.expected_rows and not self.out_of_range
+                and self.invalid_keys == 0 and self.duplicate_keys == 0)
+
+    def __str__(self):
+        lines = [
+            f"columns: {', '.join(self.columns)}",
+            f"rows: {self.rows} (expected {self.expected_rows})",
+            f"invalid day/minute keys: {self.invalid_keys}",
+            f"duplicate day/minute keys: {self.duplicate_keys}",
+        ]
+        for col, count in self.out_of_range.items():
+            lines.append(f"{col}: {count} values outside {RANGES[col]}")
+        lines.append("OK" if self.ok else "FAILED")
+        return "\n".join(lines)
+
+
+def iter_chunks(path, chunk_rows=100_000):
+    """
+      Description: Read an encoding table (.npy directory, .parquet or .csv) in blocks of rows.
+      Args:
+        - path | String
+        - chunk_rows | Number of rows per block
+
+      Returns:
+        - generator of (column names, dict of column name -> 1D numpy.array)
+    """
+    if os.path.isdir(path):
+        # memory-mapped, so slicing only pages in the block being checked
+        names = [name for name in COLUMNS if os.path.exists(os.path.join(path, f"{name}.npy"))]
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+        n_rows = len(arrays[names[0]]) if names else 0
+        for start in range(0, n_rows, chunk_rows):
+            yield names, {name: np.asarray(a[start:start + chunk_rows]) for name, a in arrays.items()}
+    elif path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.schema.names, {name: batch.column(name).to_numpy() for name in batch.schema.names}
+    else:
+        import pandas as pd
+        for df in pd.read_csv(path, chunksize=chunk_rows):
+            yield list(df.columns), {name: df[name].to_numpy() for name in df.columns}
+
+
+def validate_encoding(path, days=365, minutes_per_day=1440, expected_rows=None, chunk_rows=100_000):
+    """
+      Description: Stream an encoding table and check its columns, row count, value ranges and
+                   (day, minute) uniqueness with bounded memory. Uniqueness uses a bitmap indexed by
+                   (day-1)*minutes_per_day+minute instead of hashing whole rows.
+      Args:
+        - path | String
+        - days | Number of days in the table
+        - minutes_per_day | Number of minute slots per day
+        - expected_rows | Number, defaults to days * minutes_per_day
+        - chunk_rows | Number of rows read per block
+
+      Returns:
+        - report | ValidationReport
+    """
+    report = ValidationReport()
+    report.expected_rows = days * minutes_per_day if expected_rows is None else expected_rows
+    seen = np.zeros(days * minutes_per_day, dtype=bool)
+
+    for names, chunk in iter_chunks(path, chunk_rows):
+        if not report.columns:
+            report.columns = names
+        report.rows += len(chunk[names[0]])
+
+        for col, (low, high) in RANGES.items():
+            if col in chunk:
+                values = chunk[col]
+                bad = int(np.count_nonzero(~((values >= low) & (values <= high))))
+                if bad:
+                    report.out_of_range[col] = report.out_of_range.get(col, 0) + bad
+
+        if "day" not in chunk or "minute" not in chunk:
+            continue
+        day = chunk["day"].astype(np.int64)
+        minute = chunk["minute"].astype(np.int64)
+        valid = (day >= 1) & (day <= days) & (minute >= 0) & (minute < minutes_per_day)
+        report.invalid_keys += int(np.count_nonzero(~valid))
+        keys = np.sort((day[valid] - 1) * minutes_per_day + minute[valid])
+        # repeats inside this block, then repeats of keys seen in earlier blocks
+        repeated = keys[1:] == keys[:-1]
+        unique_keys = keys[np.concatenate(([True], ~repeated))]
+        report.duplicate_keys += int(np.count_nonzero(repeated)) + int(np.count_nonzero(seen[unique_keys]))
+        seen[unique_keys] = True
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a time encoding table without loading it into memory.")
+    parser.add_argument("path", help="time_encoding.csv, time_encoding.parquet or the time_encoding npy directory")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--minutes-per-day", type=int, default=1440)
+    parser.add_argument("--expected-rows", type=int, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    report = validate_encoding(args.path, args.days, args.minutes_per_day, args.expected_rows, args.chunk_rows)
+    print(report)
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
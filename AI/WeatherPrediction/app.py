@@ -1,12 +1,16 @@
+import hashlib
+import os
 import streamlit as st
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from sklearn.preprocessing import MinMaxScaler
-from sklearn.model_selection import train_test_split
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Input
 import tensorflow as tf
+from src.forecast import ForecastEngine
+from src.model import WindowBatches
+from src.windows import make_windows, split_windows
 
 st.set_page_config(page_title="Weather Forecast", layout="wide")
 st.title("Weather Temperature Forecast")
@@ -22,7 +26,19 @@ target_col = "Temp_C"
 st.sidebar.markdown("---")
 
 @st.cache_data
-def load_and_preprocess(csv_file, target_col):
+def data_hash(csv_file, size, mtime_ns):
+    # size/mtime are part of the cache key, so the file is only re-read when it changes
+    digest = hashlib.sha256()
+    with open(csv_file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+stat = os.stat(csv_file)
+data_key = data_hash(csv_file, stat.st_size, stat.st_mtime_ns)
+
+@st.cache_data
+def load_and_preprocess(csv_file, target_col, data_key):
     df = pd.read_csv(csv_file)
     feature_cols = ['day_sin','day_cos','time_sin','time_cos','Dew Point Temp_C','Rel Hum_%','Wind Speed_km/h','Visibility_km','Press_kPa']
     required_cols = [target_col] + feature_cols
@@ -49,20 +65,20 @@ def load_and_preprocess(csv_file, target_col):
     full_scaled = np.hstack([X_scaled, y_scaled])
     return df, full_scaled, X_scaler, y_scaler
 
-df, full_scaled, X_scaler, y_scaler = load_and_preprocess(csv_file, target_col)
+df, full_scaled, X_scaler, y_scaler = load_and_preprocess(csv_file, target_col, data_key)
 
 # -----------------------------
 # 2. Create multi-step sequences
 # -----------------------------
-def create_sequences_multi_step(data_scaled, window_size, forecast_horizon):
-    X, y = [], []
-    for i in range(len(data_scaled) - window_size - forecast_horizon + 1):
-        X.append(data_scaled[i:i+window_size, :-1])
-        y.append(data_scaled[i+window_size:i+window_size+forecast_horizon, -1])
-    return np.array(X), np.array(y)
-
-X, y = create_sequences_multi_step(full_scaled, window_size, forecast_horizon)
-X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, shuffle=False)
+# cache_resource rather than cache_data: the windows are strided views over full_scaled, and
+# cache_data would pickle (and so materialize) every window on each rerun
+@st.cache_resource
+def create_sequences_multi_step(_data_scaled, window_size, forecast_horizon, data_key):
+    # strided views over data_scaled, no per-window copies
+    X, y = make_windows(_data_scaled[:, :-1], _data_scaled[:, -1], window_size, forecast_horizon)
+    return split_windows(X, y, test_size=0.2)
+
+X_train, X_val, y_train, y_val = create_sequences_multi_step(full_scaled, window_size, forecast_horizon, data_key)
 st.write(f"Loaded {len(X_train)+len(X_val)} sequences, train/val split: {len(X_train)}/{len(X_val)}")
 
 # -----------------------------
@@ -72,42 +88,58 @@ st.subheader("Train LSTM Model")
 epochs = st.sidebar.slider("Epochs", min_value=1, max_value=200, value=50)
 batch_size = st.sidebar.slider("Batch Size", min_value=1, max_value=256, value=32)
 
-# Progress bar
-progress_bar = st.progress(0)
-status_text = st.empty()
 class StreamlitProgressCallback(tf.keras.callbacks.Callback):
-    def __init__(self, total_epochs):
+    def __init__(self, total_epochs, progress_bar, status_text):
         super().__init__()
         self.total_epochs = total_epochs
+        self.progress_bar = progress_bar
+        self.status_text = status_text
     def on_epoch_end(self, epoch, logs=None):
         progress = (epoch+1)/self.total_epochs
-        progress_bar.progress(progress)
-        status_text.text(f"Training epoch {epoch+1}/{self.total_epochs}")
+        self.progress_bar.progress(progress)
+        self.status_text.text(f"Training epoch {epoch+1}/{self.total_epochs}")
+
+# Trained once per (csv, window, horizon, epochs, batch size, data) and shared across reruns,
+# so changing a plot option does not retrain. Underscored arguments are not part of the key.
+@st.cache_resource(show_spinner=False)
+def train_forecast_model(csv_file, window_size, forecast_horizon, epochs, batch_size, data_key,
+                         _X_train, _y_train, _X_val, _y_val):
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    model = Sequential([
+        Input(shape=(_X_train.shape[1], _X_train.shape[2])),
+        LSTM(64, activation='tanh', return_sequences=True),
+        LSTM(32, activation='tanh'),
+        Dense(forecast_horizon)
+    ])
+    model.compile(optimizer=tf.keras.optimizers.Adam(0.001), loss='mse')
+
+    # batches are copied out of the window views one at a time instead of densifying all of X_train
+    model.fit(
+        WindowBatches(_X_train, _y_train, batch_size, shuffle=True),
+        validation_data=WindowBatches(_X_val, _y_val, batch_size),
+        epochs=epochs,
+        verbose=0,
+        callbacks=[StreamlitProgressCallback(epochs, progress_bar, status_text)]
+    )
+    return model
 
 # Model
-model = Sequential([
-    Input(shape=(X_train.shape[1], X_train.shape[2])),
-    LSTM(64, activation='tanh', return_sequences=True),
-    LSTM(32, activation='tanh'),
-    Dense(forecast_horizon)
-])
-model.compile(optimizer=tf.keras.optimizers.Adam(0.001), loss='mse')
-
-history = model.fit(
-    X_train, y_train,
-    validation_data=(X_val, y_val),
-    epochs=epochs,
-    batch_size=batch_size,
-    verbose=0,
-    callbacks=[StreamlitProgressCallback(epochs)]
-)
+model = train_forecast_model(csv_file, window_size, forecast_horizon, epochs, batch_size, data_key,
+                             X_train, y_train, X_val, y_val)
 st.success("Training complete!")
 
 # -----------------------------
 # 4. Evaluate validation set
 # -----------------------------
 st.subheader("Validation Evaluation")
-y_pred_val_scaled = model.predict(X_val)
+@st.cache_data(show_spinner=False)
+def predict_validation(csv_file, window_size, forecast_horizon, epochs, batch_size, data_key, _model, _X_val):
+    # keyed like train_forecast_model, so validation inference also runs once per trained model
+    return ForecastEngine(_model).direct(_X_val)
+
+y_pred_val_scaled = predict_validation(csv_file, window_size, forecast_horizon, epochs, batch_size, data_key,
+                                       model, X_val)
 y_val_original = y_val * (y_scaler.data_max_[0] - y_scaler.data_min_[0]) + y_scaler.data_min_[0]
 y_pred_val_original = y_pred_val_scaled * (y_scaler.data_max_[0] - y_scaler.data_min_[0]) + y_scaler.data_min_[0]
 
@@ -129,7 +161,8 @@ st.pyplot(fig)
 # -----------------------------
 st.subheader("Rolling Forecast Only")
 X_last_window = X_val[-1:].copy()
-rolling_preds_scaled = model.predict(X_last_window)[0]
+# direct multi-output forecast: the Dense(forecast_horizon) head predicts every step in one call
+rolling_preds_scaled = ForecastEngine(model).direct(X_last_window)[0]
 rolling_preds_original = rolling_preds_scaled * (y_scaler.data_max_[0] - y_scaler.data_min_[0]) + y_scaler.data_min_[0]
 
 fig_forecast, ax_forecast = plt.subplots(figsize=(12,6))
@@ -1,64 +1,115 @@
-from src.preprocess import load_and_preprocess
-from src.model import build_model, train_model
+import argparse
+import os
+from src.preprocess import load_scaled
+from src.model import build_model, train_model, make_datasets, save_artifact, load_artifact, METADATA_FILE
 from src.evaluate import evaluate_model
-from src.forecast import rolling_forecast_on_plot
-import numpy as np
+from src.forecast import future_time_features, plot_rolling_forecast, rolling_forecast
+from src.windows import make_windows, split_windows
 
-# -----------------------------
-# 1. Load and preprocess data
-# -----------------------------
-X_train, X_val, y_train, y_val, X_min, X_max, y_min, y_max = load_and_preprocess(
-    csv_file="data/weather.csv",
-    target_col="Temp_C",
-    window_size=24
-)
 
-# -----------------------------
-# 2. Build and train LSTM model
-# -----------------------------
-model = build_model(input_shape=(X_train.shape[1], X_train.shape[2]))
-train_model(
-    model, 
-    X_train, y_train, 
-    X_val, y_val, 
-    epochs=50, 
-    batch_size=32
-)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train, evaluate and forecast with the weather LSTM.")
+    parser.add_argument("--data", default="data/weather_combined.csv",
+                        help="CSV with time features (see merge.py) or a column store directory (see src/ingest.py)")
+    parser.add_argument("--station", default=None,
+                        help="station to use from a column store (required when it holds several)")
+    parser.add_argument("--window-size", type=int, default=24)
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--model-dir", default="models/weather_lstm", help="saved model artifact directory")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--warm-start", action="store_true",
+                      help="continue training the saved model on --data instead of starting from scratch")
+    mode.add_argument("--inference-only", action="store_true", help="load the saved model and skip training")
+    parser.add_argument("--tf-data", action="store_true", help="train from a tf.data pipeline instead of NumPy windows")
+    parser.add_argument("--no-plot", action="store_true", help="skip the evaluation and forecast plots")
+    args = parser.parse_args(argv)
 
-# -----------------------------
-# 3. Evaluate on validation set
-# -----------------------------
-evaluate_model(
-    model, 
-    X_val, y_val, 
-    y_min=y_min, 
-    y_max=y_max
-)
+    # -----------------------------
+    # 1. Load saved model (warm start / inference) and preprocess data
+    # -----------------------------
+    model, metadata, scaler_range = None, None, None
+    if args.warm_start or args.inference_only:
+        if not os.path.exists(os.path.join(args.model_dir, METADATA_FILE)):
+            parser.error(f"no saved model in {args.model_dir}")
+        model, metadata = load_artifact(args.model_dir, compile=args.warm_start)
+        args.window_size = metadata["window_size"]
+        # scale new data exactly as the saved model was trained
+        scaler_range = (metadata["X_min"], metadata["X_max"], metadata["y_min"], metadata["y_max"])
 
-# -----------------------------
-# 4. Compute average difference
-# -----------------------------
-# Predict on validation set
-y_pred_scaled = model.predict(X_val)
-y_val_original = y_val * (y_max - y_min) + y_min
-y_pred_original = y_pred_scaled * (y_max - y_min) + y_min
+    try:
+        series, X_scaler, y_scaler, last_timestamp = load_scaled(args.data, "Temp_C", args.station, scaler_range)
+        # features only as input, target temperature at the next step as output; both are views of series
+        X, y = make_windows(series[:, :-1], series[:, -1], args.window_size)
+    except ValueError as error:
+        parser.error(str(error))
+    X_train, X_val, y_train, y_val = split_windows(X, y)
+    X_min, X_max = X_scaler.data_min_, X_scaler.data_max_
+    y_min, y_max = y_scaler.data_min_[0], y_scaler.data_max_[0]
 
-# Calculate average absolute difference
-average_diff = np.mean(np.abs(y_val_original - y_pred_original))
-print(f"Average difference: {average_diff:.2f} °C")
+    # -----------------------------
+    # 2. Build and train LSTM model
+    # -----------------------------
+    if not args.inference_only:
+        if model is None:
+            model = build_model(input_shape=(X_train.shape[1], X_train.shape[2]))
+        if args.tf_data:
+            train_ds, val_ds = make_datasets(series, args.window_size, batch_size=args.batch_size, shuffle=True)
+            train_model(model, train_ds, X_val=val_ds, epochs=args.epochs)
+        else:
+            train_model(
+                model,
+                X_train, y_train,
+                X_val, y_val,
+                epochs=args.epochs,
+                batch_size=args.batch_size
+            )
+        epochs_trained = args.epochs + (metadata["epochs_trained"] if metadata else 0)
+        save_artifact(model, args.model_dir, X_min, X_max, y_min, y_max, args.window_size,
+                      epochs_trained=epochs_trained)
+        print(f"Saved model to {args.model_dir} ({epochs_trained} epochs trained)")
 
-# -----------------------------
-# 5. Rolling forecast
-# -----------------------------
-# Use the last sequence from validation set as starting point
-X_last_window = X_val[-1:].copy()
+    # -----------------------------
+    # 3. Evaluate on validation set
+    # -----------------------------
+    # predictions over X_val are computed once here and reused below
+    validation = evaluate_model(
+        model,
+        X_val, y_val,
+        y_min=y_min,
+        y_max=y_max,
+        plot=not args.no_plot
+    )
 
-# Plot validation predictions + future rolling forecast
-predictions = rolling_forecast_on_plot(
-    model,
-    X_val, y_val,
-    X_last_window,
-    steps_ahead=24,   # Forecast next 24 hours
-    y_min=y_min,
-    y_max=y_max
-)
+    # -----------------------------
+    # 4. Compute average difference
+    # -----------------------------
+    # Average absolute difference is the MAE of the cached predictions
+    print(f"Average difference: {validation['mae']:.2f} °C")
+
+    # -----------------------------
+    # 5. Rolling forecast
+    # -----------------------------
+    # Start from the last window of the data; each forecast step slides in the time features of
+    # the next hour, so the model sees the clock advance instead of the same row repeated
+    X_last_window = series[None, -args.window_size:, :-1]
+    future_features = None
+    if last_timestamp is not None:
+        future_features = future_time_features(last_timestamp, 24, 60, X_min, X_max)
+
+    predictions = rolling_forecast(
+        model,
+        X_last_window,
+        steps_ahead=24,   # Forecast next 24 hours
+        y_min=y_min,
+        y_max=y_max,
+        future_features=future_features
+    )
+    if not args.no_plot:
+        # Plot validation predictions + future rolling forecast
+        plot_rolling_forecast(validation, predictions)
+    return predictions
+
+
+if __name__ == "__main__":
+    main()
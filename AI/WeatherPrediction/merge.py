@@ -1,18 +1,69 @@
+import argparse
 import pandas as pd
-import numpy as np
+from src.time_encoding import encode_time, load_encoding, lookup_encoding, resolve_encoding_path
 
-weather = pd.read_csv("data/weather.csv")
-encoded = pd.read_csv("data/time_encoding.csv")
+# -----------------------------
+# Defaults
+# -----------------------------
+DATE_FORMAT = "%m/%d/%Y %H:%M"   # e.g. 1/1/2012 0:00
+INPUT_CSV = "data/weather.csv"
+OUTPUT_CSV = "data/weather_combined.csv"
 
-# Parse Date/Time automatically
-weather['Date/Time'] = pd.to_datetime(weather['Date/Time'], infer_datetime_format=True)
 
-# Extract day of year and minute of day
-weather['day'] = weather['Date/Time'].dt.dayofyear
-weather['minute'] = weather['Date/Time'].dt.hour * 60 + weather['Date/Time'].dt.minute
+def parse_datetimes(values, date_format=DATE_FORMAT):
+    """
+      Description: Parse Date/Time strings with an explicit format. cache=True parses each distinct
+                   string once, which pays off when several stations share the same timestamps.
+      Args:
+        - values | pandas.Series of strings
+        - date_format | String, strftime format of the values
 
-# Merge with time encoding CSV
-df = pd.merge(weather, encoded, on=['day','minute'])
+      Returns:
+        - parsed | pandas.Series of datetime64
+    """
+    return pd.to_datetime(values, format=date_format, cache=True)
 
-# Save combined CSV
-df.to_csv("data/weather_combined.csv", index=False)
+
+def merge(weather, table=None, date_format=DATE_FORMAT):
+    """
+      Description: Attach the time encoding columns to the weather rows.
+      Args:
+        - weather | pandas.DataFrame with a Date/Time column
+        - table | dict of encoding columns to index into, None to compute the encoding directly
+        - date_format | String, strftime format of Date/Time
+
+      Returns:
+        - df | pandas.DataFrame
+    """
+    weather = weather.assign(**{'Date/Time': parse_datetimes(weather['Date/Time'], date_format)})
+    timestamps = weather['Date/Time'].to_numpy()
+    # both paths are linear in the number of rows, no pd.merge hash join
+    encoding = encode_time(timestamps) if table is None else lookup_encoding(table, timestamps)
+    return weather.assign(**encoding)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add the cyclical time encoding to the weather data.")
+    parser.add_argument("--input", default=INPUT_CSV, help="weather CSV with a Date/Time column")
+    parser.add_argument("--output", default=OUTPUT_CSV, help="combined CSV to write")
+    parser.add_argument("--date-format", default=DATE_FORMAT, help="strftime format of Date/Time")
+    parser.add_argument("--table", default=None,
+                        help="look the encoding up in a minute or hourly time_encoding table (path without extension) "
+                             "instead of computing it")
+    args = parser.parse_args(argv)
+
+    table = None
+    if args.table:
+        path = resolve_encoding_path(args.table)
+        if path is None:
+            parser.error(f"no time encoding table found for {args.table}")
+        table = load_encoding(path)
+
+    df = merge(pd.read_csv(args.input), table, args.date_format)
+
+    # Save combined CSV
+    df.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
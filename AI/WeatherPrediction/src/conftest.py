@@ -0,0 +1,6 @@
+import os
+import sys
+
+# library modules import each other through the src package (as `python -m src.serve` does from the
+# project directory), so the tests need that directory on sys.path too
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -1,26 +1,80 @@
-import matplotlib.pyplot as plt
 import numpy as np
-from sklearn.metrics import mean_absolute_error, mean_squared_error  # type: ignore
+from src.forecast import ForecastEngine
 
-def evaluate_model(model, X_val, y_val, y_min, y_max):
-    # Predict
-    y_pred_scaled = model.predict(X_val)
-    # Invert scaling
-    y_val_original = y_val * (y_max - y_min) + y_min
-    y_pred_original = y_pred_scaled * (y_max - y_min) + y_min
 
-    # Plot
+def compute_metrics(y_true, y_pred):
+    """
+    Error metrics in original units.
+
+    Args:
+        y_true: (n,) or (n, horizon) actual values.
+        y_pred: Predictions of the same number of values.
+
+    Returns:
+        metrics: dict with mae, rmse and, per forecast step, per_horizon_mae / per_horizon_rmse arrays.
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    errors = np.asarray(y_pred, dtype=np.float64).reshape(y_true.shape) - y_true
+    per_step = errors.reshape(len(errors), -1)
+    return {
+        "mae": float(np.mean(np.abs(errors))),
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "per_horizon_mae": np.mean(np.abs(per_step), axis=0),
+        "per_horizon_rmse": np.sqrt(np.mean(per_step ** 2, axis=0)),
+    }
+
+
+def predict_validation(model, X_val, y_val, y_min, y_max):
+    """
+    Run inference over the validation set once and keep the results for every consumer.
+
+    Args:
+        model: Trained Keras model.
+        X_val, y_val: Validation windows and scaled targets.
+        y_min, y_max: Target scaler min/max for inverting scaling.
+
+    Returns:
+        result: dict with y_true and y_pred in original units plus the compute_metrics entries.
+    """
+    y_pred_scaled = ForecastEngine(model).direct(X_val)
+    y_true = np.asarray(y_val) * (y_max - y_min) + y_min
+    y_pred = y_pred_scaled.reshape(y_true.shape) * (y_max - y_min) + y_min
+    return {"y_true": y_true, "y_pred": y_pred, **compute_metrics(y_true, y_pred)}
+
+
+def plot_predictions(result):
+    """
+    Plot actual vs predicted validation values from predict_validation.
+    """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12,6))
-    plt.plot(y_val_original, label="Actual Temp_C")
-    plt.plot(y_pred_original, label="Predicted Temp_C")
+    plt.plot(result["y_true"], label="Actual Temp_C")
+    plt.plot(result["y_pred"], label="Predicted Temp_C")
     plt.xlabel("Time step")
     plt.ylabel("Temperature (°C)")
     plt.title("Validation: Actual vs Predicted")
     plt.legend()
     plt.show()
 
-    # Metrics
-    mae = mean_absolute_error(y_val_original, y_pred_original)
-    rmse = np.sqrt(mean_squared_error(y_val_original, y_pred_original))
-    print(f"Validation MAE: {mae:.2f} °C")
-    print(f"Validation RMSE: {rmse:.2f} °C")
+
+def evaluate_model(model, X_val, y_val, y_min, y_max, plot=True, result=None):
+    """
+    Evaluate on the validation set, print MAE/RMSE and optionally plot.
+
+    Args:
+        model, X_val, y_val, y_min, y_max: As for predict_validation.
+        plot: Show the actual vs predicted plot.
+        result: Cached output of predict_validation to reuse instead of predicting again.
+
+    Returns:
+        result: Output of predict_validation.
+    """
+    if result is None:
+        result = predict_validation(model, X_val, y_val, y_min, y_max)
+    if plot:
+        plot_predictions(result)
+
+    print(f"Validation MAE: {result['mae']:.2f} °C")
+    print(f"Validation RMSE: {result['rmse']:.2f} °C")
+    return result
@@ -1,45 +1,163 @@
-import matplotlib.pyplot as plt
 import numpy as np
+import tensorflow as tf # type: ignore
+from src.time_encoding import encode_time
 
-def rolling_forecast_on_plot(model, X_val, y_val, X_last_window, steps_ahead, y_min, y_max):
+TIME_FEATURES = ['day_sin', 'day_cos', 'time_sin', 'time_cos']
+
+
+def future_time_features(last_timestamp, steps, step_minutes=60, X_min=None, X_max=None):
     """
-    Combines validation actual/predicted and future rolling forecast on the same plot.
-    
-    X_val, y_val: validation sequences and targets
+    Time-feature rows for the steps after last_timestamp, scaled like the training inputs.
+
+    Args:
+        last_timestamp: Timestamp of the last row in the input window.
+        steps: Number of future rows.
+        step_minutes: Spacing of the rows (60 for hourly data).
+        X_min, X_max: Feature scaler min/max from load_and_preprocess (no scaling when None).
+
+    Returns:
+        features: (steps, 4) float32 array of day_sin, day_cos, time_sin, time_cos.
+    """
+    start = np.datetime64(last_timestamp, 'm')
+    timestamps = start + np.arange(1, steps + 1) * np.timedelta64(step_minutes, 'm')
+    encoding = encode_time(timestamps)
+    features = np.stack([encoding[col] for col in TIME_FEATURES], axis=-1)
+    if X_min is not None:
+        features = (features - X_min) / (X_max - X_min)
+    return features.astype(np.float32)
+
+
+class ForecastEngine:
+    """
+    Batched forecasting on a trained model, calling it directly under tf.function instead of
+    paying model.predict's per-call setup for every step.
+
+    Args:
+        model: Keras model mapping (batch, window, features) to (batch, outputs).
+        batch_size: Start windows evaluated per model call.
+    """
+
+    def __init__(self, model, batch_size=1024):
+        self.model = model
+        self.batch_size = batch_size
+        self._call = tf.function(lambda x: model(x, training=False), reduce_retracing=True)
+        self._rollout = tf.function(self._rollout_graph, reduce_retracing=True)
+
+    def _batches(self, *arrays):
+        for start in range(0, len(arrays[0]), self.batch_size):
+            yield [tf.convert_to_tensor(np.asarray(a[start:start + self.batch_size], dtype=np.float32))
+                   for a in arrays]
+
+    def direct(self, windows):
+        """
+        Direct multi-output forecast: one model call per batch of start windows.
+
+        Args:
+            windows: (n, window, features) array.
+
+        Returns:
+            predictions: (n, outputs) scaled predictions, e.g. (n, forecast_horizon) for a
+                         Dense(forecast_horizon) head.
+        """
+        return np.concatenate([self._call(x).numpy() for (x,) in self._batches(windows)])
+
+    def _rollout_graph(self, window, future, target_mask):
+        steps = tf.shape(future)[1]
+        preds = tf.TensorArray(tf.float32, size=steps)
+        for i in tf.range(steps):
+            y = self.model(window, training=False)[:, 0]
+            preds = preds.write(i, y)
+            # next input row: known future features, with the prediction fed back into the target column
+            row = future[:, i, :] * (1 - target_mask) + y[:, None] * target_mask
+            window = tf.concat([window[:, 1:, :], row[:, None, :]], axis=1)
+        return tf.transpose(preds.stack())
+
+    def autoregressive(self, windows, steps, future_features=None, target_index=None):
+        """
+        Autoregressive forecast: predict one step, slide it into the window, repeat.
+
+        The whole loop for a batch runs as one compiled graph.
+
+        Args:
+            windows: (n, window, features) array of start windows.
+            steps: Number of steps to forecast.
+            future_features: (steps, features) or (n, steps, features) input rows for the
+                             forecast steps, e.g. from future_time_features. Repeats each
+                             window's last row when None.
+            target_index: Input column holding the target, overwritten with each prediction.
+                          None when the target is not one of the inputs.
+
+        Returns:
+            predictions: (n, steps) scaled predictions.
+        """
+        windows = np.asarray(windows, dtype=np.float32)
+        if future_features is None:
+            future = np.repeat(windows[:, -1:, :], steps, axis=1)
+        else:
+            future = np.broadcast_to(np.asarray(future_features, dtype=np.float32),
+                                     (len(windows), steps, windows.shape[-1]))
+        target_mask = np.zeros(windows.shape[-1], dtype=np.float32)
+        if target_index is not None:
+            target_mask[target_index] = 1
+        target_mask = tf.constant(target_mask)
+        return np.concatenate([self._rollout(x, f, target_mask).numpy()
+                               for x, f in self._batches(windows, future)])
+
+
+def rolling_forecast(model, X_last_window, steps_ahead, y_min, y_max, future_features=None, target_index=None,
+                     engine=None):
+    """
+    Rolling forecast from the last window, in original units.
+
     X_last_window: the last sequence to start rolling forecast
     steps_ahead: how many future steps to predict
     y_min, y_max: for inverting scaling
+    future_features, target_index: inputs for the forecast steps, see ForecastEngine.autoregressive
+    engine: ForecastEngine to reuse (one is built for the model when None)
     """
-    # --- 1. Validation predictions ---
-    y_pred_val_scaled = model.predict(X_val)
-    y_val_original = y_val * (y_max - y_min) + y_min
-    y_pred_val = y_pred_val_scaled * (y_max - y_min) + y_min
-
-    # --- 2. Rolling forecast ---
-    rolling_preds = []
-    current_window = X_last_window.copy()
-    for _ in range(steps_ahead):
-        pred_scaled = model.predict(current_window)[0,0]
-        rolling_preds.append(pred_scaled)
+    engine = engine or ForecastEngine(model)
+    rolling_preds = engine.autoregressive(X_last_window, steps_ahead, future_features, target_index)[0]
+    return rolling_preds * (y_max - y_min) + y_min
 
-        # Shift window: keep last features, append prediction as the last "target" feature
-        new_window = np.vstack([current_window[0,1:], current_window[0,-1]])
-        current_window = np.array([new_window])
 
-    rolling_preds_original = np.array(rolling_preds) * (y_max - y_min) + y_min
+def plot_rolling_forecast(validation, rolling_preds_original):
+    """
+    Plot validation actual/predicted (from src.evaluate.predict_validation) followed by the rolling forecast.
+    """
+    import matplotlib.pyplot as plt
 
-    # --- 3. Combine for plotting ---
+    steps_ahead = len(rolling_preds_original)
     plt.figure(figsize=(12,6))
-    plt.plot(y_val_original, label="Validation Actual")
-    plt.plot(y_pred_val, label="Validation Predicted")
+    plt.plot(validation["y_true"], label="Validation Actual")
+    plt.plot(validation["y_pred"], label="Validation Predicted")
     # Extend x-axis for rolling forecast
-    x_forecast = np.arange(len(y_val_original), len(y_val_original)+steps_ahead)
+    x_forecast = np.arange(len(validation["y_true"]), len(validation["y_true"])+steps_ahead)
     plt.plot(x_forecast, rolling_preds_original, label=f"Rolling Forecast ({steps_ahead} steps)")
-    
+
     plt.xlabel("Time step")
     plt.ylabel("Temperature (°C)")
     plt.title("Validation Predictions + Rolling Forecast")
     plt.legend()
     plt.show()
 
+
+def rolling_forecast_on_plot(model, X_val, y_val, X_last_window, steps_ahead, y_min, y_max,
+                             future_features=None, target_index=None, validation=None):
+    """
+    Combines validation actual/predicted and future rolling forecast on the same plot.
+
+    X_val, y_val: validation sequences and targets
+    X_last_window: the last sequence to start rolling forecast
+    steps_ahead: how many future steps to predict
+    y_min, y_max: for inverting scaling
+    future_features, target_index: inputs for the forecast steps, see ForecastEngine.autoregressive
+    validation: cached src.evaluate.predict_validation result, so X_val is not predicted again
+    """
+    from src.evaluate import predict_validation
+
+    if validation is None:
+        validation = predict_validation(model, X_val, y_val, y_min, y_max)
+    rolling_preds_original = rolling_forecast(model, X_last_window, steps_ahead, y_min, y_max,
+                                              future_features, target_index)
+    plot_rolling_forecast(validation, rolling_preds_original)
     return rolling_preds_original
@@ -0,0 +1,265 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from src.time_encoding import encode_time
+
+# -----------------------------
+# Store layout
+# -----------------------------
+# One raw little-endian file per column plus meta.json holding the row count and dtypes.
+# Columns are appended chunk by chunk and read back with np.memmap, so neither side
+# ever holds a whole station history in memory.
+META_FILE = "meta.json"
+DATE_COLUMN = "Date/Time"
+DATE_FORMAT = "%m/%d/%Y %H:%M"
+TEXT_COLUMNS = ["Weather"]
+ENCODING_COLUMNS = ["day_sin", "day_cos", "time_sin", "time_cos", "normalized_value"]
+FIXED_COLUMNS = {"station": "<i2", "timestamp": "<i8", "day": "<i2", "minute": "<i2"}
+
+
+def _column_path(store_dir, name):
+    # column names such as "Rel Hum_%" or "Wind Speed_km/h" are not safe file names
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+    return os.path.join(store_dir, f"{safe}.bin")
+
+
+def read_meta(store_dir):
+    """
+    Read the store metadata, or an empty store description if none exists yet.
+
+    Args:
+        store_dir: Directory of the column store.
+
+    Returns:
+        meta: dict with rows, columns (name -> dtype), stations and files.
+    """
+    path = os.path.join(store_dir, META_FILE)
+    if not os.path.exists(path):
+        return {"rows": 0, "columns": {}, "stations": [], "files": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_meta(store_dir, meta):
+    # write then rename so a crash mid-ingest never leaves a half-written meta.json
+    path = os.path.join(store_dir, META_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _truncate_to_meta(store_dir, meta):
+    # drop bytes appended after the last committed chunk (e.g. from an interrupted run)
+    if not meta["columns"]:
+        # no committed schema: any column file is left over from a run that died before meta.json
+        for path in glob.glob(os.path.join(store_dir, "*.bin")):
+            os.remove(path)
+        return
+    for name, dtype in meta["columns"].items():
+        path = _column_path(store_dir, name)
+        if os.path.exists(path):
+            with open(path, "r+b") as f:
+                f.truncate(meta["rows"] * np.dtype(dtype).itemsize)
+
+
+def encode_chunk(chunk, station_id, numeric_columns, date_format=DATE_FORMAT):
+    """
+    Parse, coerce and time-encode one chunk of station rows.
+
+    Rows whose Date/Time does not parse are dropped; bad measurements are kept as NaN.
+
+    Args:
+        chunk: DataFrame read from a station CSV.
+        station_id: Index of the station in the store metadata.
+        numeric_columns: Measurement columns to keep; missing ones are filled with NaN.
+        date_format: strftime format of the Date/Time column.
+
+    Returns:
+        columns: dict of column name -> 1D numpy array, one entry per store column and kept row.
+    """
+    timestamps = pd.to_datetime(chunk[DATE_COLUMN], format=date_format, cache=True, errors="coerce")
+    valid = timestamps.notna().to_numpy()
+    if not valid.all():
+        chunk = chunk[valid]
+    timestamps = timestamps.to_numpy()[valid]
+    encoding = encode_time(timestamps)
+    columns = {
+        "station": np.full(len(chunk), station_id),
+        "timestamp": timestamps.astype("datetime64[m]").astype(np.int64),
+        "day": encoding["day"],
+        "minute": encoding["minute"],
+    }
+    for name in ENCODING_COLUMNS:
+        columns[name] = encoding[name]
+    for name in numeric_columns:
+        if name in chunk:
+            # stray text such as "M" or "" for missing readings becomes NaN instead of failing the chunk
+            columns[name] = pd.to_numeric(chunk[name], errors="coerce").to_numpy()
+        else:
+            columns[name] = np.full(len(chunk), np.nan)
+    return columns
+
+
+def _prefix_digest(path, size, block_size=1 << 20):
+    # sha256 of the first size bytes: the part of a station file already in the store
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while size > 0:
+            block = f.read(min(block_size, size))
+            if not block:
+                break
+            digest.update(block)
+            size -= len(block)
+    return digest.hexdigest()
+
+
+def ingest_directory(source_dir, store_dir, pattern="*.csv", chunk_rows=100_000, date_format=DATE_FORMAT):
+    """
+    Stream every station CSV in a directory into the column store, a chunk at a time.
+
+    Each file is one station (named after the file). Files whose size and modification time
+    are unchanged are skipped, and rows already stored from a grown file are not read again,
+    so re-running only appends new data. Station files must be append-only: a file that shrank
+    or whose already stored bytes changed raises ValueError, since its old rows are in the store.
+    Rows with an unparseable Date/Time are dropped and counted in meta["files"][name]["dropped"].
+
+    Args:
+        source_dir: Directory of station CSVs.
+        store_dir: Directory of the column store (created if missing).
+        pattern: Glob of the CSV files inside source_dir.
+        chunk_rows: Rows read and appended per chunk; bounds peak memory.
+        date_format: strftime format of the Date/Time column.
+
+    Returns:
+        meta: The updated store metadata.
+
+    Raises:
+        ValueError: A station file was truncated or edited after it was ingested.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    meta = read_meta(store_dir)
+    _truncate_to_meta(store_dir, meta)
+
+    for path in sorted(glob.glob(os.path.join(source_dir, pattern))):
+        stat = os.stat(path)
+        name = os.path.basename(path)
+        previous = meta["files"].get(name, {"rows": 0})
+        if previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+            continue
+        if "sha256" in previous and (stat.st_size < previous["size"]
+                                     or _prefix_digest(path, previous["size"]) != previous["sha256"]):
+            raise ValueError(f"{name} was truncated or edited after it was ingested; station files must be "
+                             f"append-only, rebuild {store_dir} from scratch")
+
+        station = os.path.splitext(name)[0]
+        if station not in meta["stations"]:
+            meta["stations"].append(station)
+        station_id = meta["stations"].index(station)
+
+        file_rows = previous["rows"]
+        dropped = previous.get("dropped", 0)
+        # station files are append-only logs: skip the rows a previous run already stored
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, skiprows=range(1, file_rows + 1)):
+            if not meta["columns"]:
+                # the first file fixes the schema: every non-text, non-date column is a float32 measurement
+                numeric = [c for c in chunk.columns if c != DATE_COLUMN and c not in TEXT_COLUMNS]
+                meta["columns"] = {**FIXED_COLUMNS, **{c: "<f4" for c in ENCODING_COLUMNS + numeric}}
+                # commit the schema with rows: 0 before any bytes are appended, so a crash in the
+                # first chunk is truncated away on the next run
+                _write_meta(store_dir, meta)
+            numeric = [c for c in meta["columns"] if c not in FIXED_COLUMNS and c not in ENCODING_COLUMNS]
+
+            columns = encode_chunk(chunk, station_id, numeric, date_format)
+            kept = len(columns["station"])
+            for col, dtype in meta["columns"].items():
+                with open(_column_path(store_dir, col), "ab") as f:
+                    f.write(np.ascontiguousarray(columns[col], dtype=dtype).tobytes())
+            meta["rows"] += kept
+            # rows counts source lines consumed (for skiprows), dropped the ones with a bad Date/Time
+            file_rows += len(chunk)
+            dropped += len(chunk) - kept
+            meta["files"][name] = {"rows": file_rows, "dropped": dropped}
+            _write_meta(store_dir, meta)
+
+        meta["files"][name] = {"rows": file_rows, "dropped": dropped, "size": stat.st_size,
+                               "mtime_ns": stat.st_mtime_ns, "sha256": _prefix_digest(path, stat.st_size)}
+        _write_meta(store_dir, meta)
+    return meta
+
+
+def open_store(store_dir, columns=None, station=None):
+    """
+    Memory-map columns of the store.
+
+    Args:
+        store_dir: Directory of the column store.
+        columns: Column names to open, defaults to every column.
+        station: Station name to select; rows of other stations are dropped (this copies).
+
+    Returns:
+        table: dict of column name -> numpy array (np.memmap when station is None).
+    """
+    meta = read_meta(store_dir)
+    if columns is None:
+        columns = list(meta["columns"])
+    for col in columns:
+        if col not in meta["columns"]:
+            raise ValueError(f"Column '{col}' not found in store")
+    table = {col: np.memmap(_column_path(store_dir, col), dtype=meta["columns"][col], mode="r", shape=(meta["rows"],))
+             for col in columns}
+    if station is not None:
+        if station not in meta["stations"]:
+            raise ValueError(f"Station '{station}' not found in store")
+        ids = np.memmap(_column_path(store_dir, "station"), dtype=meta["columns"]["station"], mode="r",
+                        shape=(meta["rows"],))
+        mask = ids == meta["stations"].index(station)
+        table = {col: values[mask] for col, values in table.items()}
+    return table
+
+
+def open_series(store_dir, columns, station=None):
+    """
+    Open the columns of one station's history for modelling.
+
+    Rows of different stations are interleaved in append order, so windows over a multi-station
+    store would span station boundaries. A station must be named unless the store has only one.
+
+    Args:
+        store_dir: Directory of the column store.
+        columns: Column names to open.
+        station: Station name, optional for single-station stores.
+
+    Returns:
+        table: dict of column name -> numpy array.
+    """
+    stations = read_meta(store_dir)["stations"]
+    if station is None and len(stations) > 1:
+        raise ValueError(f"Store holds {len(stations)} stations ({', '.join(stations)}), choose one with station=")
+    return open_store(store_dir, columns, station=station)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a directory of station CSVs into a column store.")
+    parser.add_argument("source", help="directory of station CSV files")
+    parser.add_argument("store", help="column store directory to create or append to")
+    parser.add_argument("--pattern", default="*.csv", help="glob of station files inside source")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="rows read per chunk")
+    parser.add_argument("--date-format", default=DATE_FORMAT, help="strftime format of Date/Time")
+    args = parser.parse_args(argv)
+
+    try:
+        meta = ingest_directory(args.source, args.store, args.pattern, args.chunk_rows, args.date_format)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"{meta['rows']} rows from {len(meta['stations'])} station(s) in {args.store}")
+    dropped = sum(entry.get("dropped", 0) for entry in meta["files"].values())
+    if dropped:
+        print(f"{dropped} row(s) with an unparseable {DATE_COLUMN} were skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,23 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+import numpy as np
 from tensorflow.keras.models import Sequential # type: ignore
 from tensorflow.keras.layers import LSTM, Dense, Input # type: ignore
 import tensorflow as tf # type: ignore
 
+# -----------------------------
+# Saved model artifact
+# -----------------------------
+# DIR/model.keras holds the network, DIR/metadata.json the scaling and window configuration
+# needed to feed it. Bump ARTIFACT_VERSION when the metadata layout changes.
+ARTIFACT_VERSION = 1
+MODEL_FILE = "model.keras"
+METADATA_FILE = "metadata.json"
+
 def build_model(input_shape):
     model = Sequential([
         Input(shape=input_shape),
@@ -13,11 +29,189 @@ def build_model(input_shape):
     return model
 
 
-def train_model(model, X_train, y_train, X_val, y_val, epochs=50, batch_size=32):
+def make_datasets(series, window_size=24, horizon=1, batch_size=32, test_size=0.2, shuffle=False):
+    """
+    Build train/validation tf.data pipelines that cut windows out of the scaled series on the fly.
+
+    The series is held once as a tensor and the pipelines stream window start indices:
+    index -> shuffle -> batch -> gather windows in parallel -> prefetch. Only the current
+    batches are ever expanded, so memory stays O(rows) and shuffling draws a new order every
+    epoch. There is nothing worth caching: the series is already in memory, indices are free to
+    regenerate and cached windows would be the expanded copy this avoids. The split matches
+    src.windows.split_windows.
+
+    Args:
+        series: (rows, n_features + 1) scaled array with the target as last column
+                (full_scaled from src.preprocess.load_scaled).
+        window_size: Number of past rows per input window.
+        horizon: Number of future target values per window.
+        batch_size: Windows per batch.
+        test_size: Fraction of windows for validation.
+        shuffle: Shuffle training windows each epoch.
+
+    Returns:
+        train_ds, val_ds: Datasets of (X, y) batches with X (batch, window_size, n_features)
+                          and y (batch,) or (batch, horizon).
+    """
+    length = window_size + horizon
+    n_windows = len(series) - length + 1
+    split = n_windows - math.ceil(test_size * n_windows)
+    series = tf.constant(np.asarray(series, dtype=np.float32))
+    offsets = tf.range(length, dtype=tf.int64)
+
+    def gather_windows(starts):
+        batch = tf.gather(series, starts[:, None] + offsets)  # (batch, length, columns)
+        X = batch[:, :window_size, :-1]
+        y = batch[:, window_size:, -1]
+        return X, (y[:, 0] if horizon == 1 else y)
+
+    def pipeline(start, stop, shuffle_windows):
+        ds = tf.data.Dataset.range(start, stop)
+        if shuffle_windows:
+            ds = ds.shuffle(stop - start, reshuffle_each_iteration=True)
+        ds = ds.batch(batch_size).map(gather_windows, num_parallel_calls=tf.data.AUTOTUNE)
+        return ds.prefetch(tf.data.AUTOTUNE)
+
+    train_ds = pipeline(0, split, shuffle)
+    val_ds = pipeline(split, n_windows, False)
+    return train_ds, val_ds
+
+
+class WindowBatches(tf.keras.utils.PyDataset):
+    """
+    Feed windows from src.windows.make_windows to Keras one batch at a time.
+
+    Passing a strided window view straight to model.fit converts all of it into one dense
+    (n, window, features) tensor. Here only the current batch is copied out of the view.
+
+    Args:
+        X, y: Windows and targets (views are fine).
+        batch_size: Windows per batch.
+        shuffle: Draw windows in a new random order every epoch, like model.fit does for arrays.
+    """
+
+    def __init__(self, X, y, batch_size=32, shuffle=False, **kwargs):
+        super().__init__(**kwargs)
+        self.X, self.y = X, y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.order = np.arange(len(X))
+        self.on_epoch_end()
+
+    def __len__(self):
+        return math.ceil(len(self.X) / self.batch_size)
+
+    def __getitem__(self, index):
+        rows = self.order[index * self.batch_size:(index + 1) * self.batch_size]
+        # fancy indexing copies just these windows out of the view
+        return np.asarray(self.X[rows], dtype=np.float32), np.asarray(self.y[rows], dtype=np.float32)
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.order)
+
+
+def train_model(model, X_train, y_train=None, X_val=None, y_val=None, epochs=50, batch_size=32):
+    """
+    Fit the model on NumPy windows (batched lazily through WindowBatches), or on tf.data
+    pipelines from make_datasets.
+
+    Args:
+        model: Compiled Keras model.
+        X_train, y_train: Training windows and targets, or a tf.data.Dataset of (X, y)
+                          batches as X_train with y_train left as None.
+        X_val, y_val: Validation windows and targets, or a tf.data.Dataset as X_val.
+        epochs: Training epochs.
+        batch_size: Batch size for NumPy inputs (datasets are already batched).
+
+    Returns:
+        history: Keras History.
+    """
+    if isinstance(X_train, tf.data.Dataset):
+        return model.fit(X_train, validation_data=X_val, epochs=epochs)
+
     history = model.fit(
-        X_train, y_train,
-        validation_data=(X_val, y_val),
-        epochs=epochs,
-        batch_size=batch_size
+        WindowBatches(X_train, y_train, batch_size, shuffle=True),
+        validation_data=WindowBatches(X_val, y_val, batch_size),
+        epochs=epochs
     )
     return history
+
+
+def save_artifact(model, directory, X_min, X_max, y_min, y_max, window_size, horizon=1, target_col="Temp_C",
+                  epochs_trained=0):
+    """
+    Save a trained model with everything needed to scale its inputs and outputs.
+
+    The artifact is written to a temporary directory next to directory and then renamed into
+    place, so an interrupted save leaves the previous artifact untouched.
+
+    Args:
+        model: Trained Keras model.
+        directory: Artifact directory (created if missing).
+        X_min, X_max, y_min, y_max: Fitted scaler min/max from load_and_preprocess.
+        window_size: Input window length the model was trained on.
+        horizon: Number of steps the model predicts per window.
+        target_col: Name of the predicted column.
+        epochs_trained: Total epochs behind these weights, accumulated across warm starts.
+
+    Returns:
+        metadata: dict written to metadata.json.
+    """
+    directory = os.path.abspath(directory)
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    metadata = {
+        "version": ARTIFACT_VERSION,
+        "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target_col": target_col,
+        "window_size": int(window_size),
+        "horizon": int(horizon),
+        "input_shape": [int(d) for d in model.input_shape[1:]],
+        "X_min": np.asarray(X_min, dtype=float).tolist(),
+        "X_max": np.asarray(X_max, dtype=float).tolist(),
+        "y_min": float(y_min),
+        "y_max": float(y_max),
+        "epochs_trained": int(epochs_trained),
+    }
+    staging = tempfile.mkdtemp(prefix=os.path.basename(directory) + ".", dir=os.path.dirname(directory))
+    previous = None
+    try:
+        model.save(os.path.join(staging, MODEL_FILE))
+        with open(os.path.join(staging, METADATA_FILE), "w") as f:
+            json.dump(metadata, f, indent=2)
+        # os.replace cannot overwrite a non-empty directory: move the old artifact aside first
+        if os.path.exists(directory):
+            previous = staging + ".old"
+            os.replace(directory, previous)
+        os.replace(staging, directory)
+    except BaseException:
+        if previous and not os.path.exists(directory):
+            os.replace(previous, directory)
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if previous:
+        shutil.rmtree(previous, ignore_errors=True)
+    return metadata
+
+
+def load_artifact(directory, compile=True):
+    """
+    Load a model saved by save_artifact.
+
+    Args:
+        directory: Artifact directory.
+        compile: Restore the optimizer state too (needed to warm-start training).
+
+    Returns:
+        model: Keras model.
+        metadata: dict from metadata.json with X_min/X_max as numpy arrays.
+    """
+    with open(os.path.join(directory, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    if metadata.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported model artifact version {metadata.get('version')} in {directory} "
+                         f"(expected {ARTIFACT_VERSION})")
+    metadata["X_min"] = np.asarray(metadata["X_min"])
+    metadata["X_max"] = np.asarray(metadata["X_max"])
+    model = tf.keras.models.load_model(os.path.join(directory, MODEL_FILE), compile=compile)
+    return model, metadata
@@ -1,30 +1,40 @@
+import os
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split # type: ignore
 from sklearn.preprocessing import MinMaxScaler # type: ignore
+from src.ingest import DATE_COLUMN, open_series
+from src.windows import make_windows, split_windows
 
-def load_and_preprocess(csv_file: str, target_col: str = "Temp_C", window_size: int = 24, test_size: float = 0.2):
+def load_scaled(csv_file: str, target_col: str = "Temp_C", station: str = None, scaler_range: tuple = None):
     """
-    Load CSV with temperature + time features, normalize, and create LSTM sequences.
+    Load CSV (or column store) with temperature + time features and normalize it.
     
     Args:
         csv_file: Path to CSV containing at least target_col and time features:
-                  ['day_sin','day_cos','time_sin','time_cos'].
+                  ['day_sin','day_cos','time_sin','time_cos'], or a column store
+                  directory written by src.ingest.
         target_col: Column to predict (temperature).
-        window_size: Sequence length for LSTM.
-        test_size: Fraction of data for validation.
+        station: Station to use from a column store (required when it holds several).
+        scaler_range: (X_min, X_max, y_min, y_max) to scale with instead of fitting, e.g. from a
+                      saved model artifact, so new data matches the model's scaling.
     
     Returns:
-        X_train, X_val, y_train, y_val: LSTM-ready sequences
-        X_min, X_max, y_min, y_max: Scalars for rescaling
+        full_scaled: (rows, 5) array of scaled time features with the target as last column
+        X_scaler, y_scaler: Fitted MinMaxScalers
+        last_timestamp: numpy datetime64 of the last row (None without a Date/Time column),
+                        to place forecast steps after the data
     """
     # ----------------------
     # 1. Load data
     # ----------------------
-    df = pd.read_csv(csv_file)
+    required_cols = [target_col, 'day_sin','day_cos','time_sin','time_cos']
+    if os.path.isdir(csv_file):
+        # memory-mapped store: only the needed columns are paged in
+        df = pd.DataFrame(open_series(csv_file, required_cols + ["timestamp"], station=station))
+    else:
+        df = pd.read_csv(csv_file)
     
     # Ensure required columns exist
-    required_cols = [target_col, 'day_sin','day_cos','time_sin','time_cos']
     for col in required_cols:
         if col not in df.columns:
             raise ValueError(f"Column '{col}' not found in CSV")
@@ -40,28 +50,61 @@ def load_and_preprocess(csv_file: str, target_col: str = "Temp_C", window_size:
     # ----------------------
     X_scaler = MinMaxScaler()
     y_scaler = MinMaxScaler()
-    
-    X_scaled = X_scaler.fit_transform(data[:, :-1])          # time features
-    y_scaled = y_scaler.fit_transform(data[:, -1].reshape(-1,1))  # temperature
+    if scaler_range is not None:
+        # fit on the saved min/max so transform reproduces the original scaling
+        X_min, X_max, y_min, y_max = scaler_range
+        X_scaler.fit(np.vstack([X_min, X_max]))
+        y_scaler.fit(np.array([[y_min], [y_max]]))
+        X_scaled = X_scaler.transform(data[:, :-1])
+        y_scaled = y_scaler.transform(data[:, -1].reshape(-1,1))
+    else:
+        X_scaled = X_scaler.fit_transform(data[:, :-1])          # time features
+        y_scaled = y_scaler.fit_transform(data[:, -1].reshape(-1,1))  # temperature
     
     # Combine scaled features + target for sequence creation
     full_scaled = np.hstack([X_scaled, y_scaled])
+
+    # column stores keep minutes since the epoch, CSVs the Date/Time string
+    last_timestamp = None
+    if "timestamp" in df.columns:
+        last_timestamp = np.datetime64(int(df["timestamp"].iloc[-1]), "m")
+    elif DATE_COLUMN in df.columns:
+        last_timestamp = pd.to_datetime(df[DATE_COLUMN].iloc[-1]).to_datetime64()
+    
+    return full_scaled, X_scaler, y_scaler, last_timestamp
+
+
+def load_and_preprocess(csv_file: str, target_col: str = "Temp_C", window_size: int = 24, test_size: float = 0.2,
+                        station: str = None, scaler_range: tuple = None):
+    """
+    Load CSV with temperature + time features, normalize, and create LSTM sequences.
+    
+    Args:
+        csv_file: Path to CSV containing at least target_col and time features:
+                  ['day_sin','day_cos','time_sin','time_cos'], or a column store
+                  directory written by src.ingest.
+        target_col: Column to predict (temperature).
+        window_size: Sequence length for LSTM.
+        test_size: Fraction of data for validation.
+        station: Station to use from a column store (required when it holds several).
+        scaler_range: Saved (X_min, X_max, y_min, y_max) to scale with, see load_scaled.
+    
+    Returns:
+        X_train, X_val, y_train, y_val: LSTM-ready sequences
+        X_min, X_max, y_min, y_max: Scalars for rescaling
+    """
+    full_scaled, X_scaler, y_scaler, _ = load_scaled(csv_file, target_col, station, scaler_range)
     
     # ----------------------
     # 4. Create sequences
     # ----------------------
-    X, y = [], []
-    for i in range(len(full_scaled) - window_size):
-        X.append(full_scaled[i:i+window_size, :-1])  # features only
-        y.append(full_scaled[i+window_size, -1])     # target temperature at next step
-    
-    X = np.array(X)
-    y = np.array(y)
+    # features only as input, target temperature at the next step as output; both are views
+    X, y = make_windows(full_scaled[:, :-1], full_scaled[:, -1], window_size)
     
     # ----------------------
     # 5. Train/validation split
     # ----------------------
-    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=test_size, shuffle=False)
+    X_train, X_val, y_train, y_val = split_windows(X, y, test_size)
     
     # Return min/max for rescaling
     X_min, X_max = X_scaler.data_min_, X_scaler.data_max_
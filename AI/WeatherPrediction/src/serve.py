@@ -0,0 +1,285 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.forecast import ForecastEngine, TIME_FEATURES, encode_time, future_time_features
+from src.model import load_artifact
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY = 1 << 20
+LATENCY_SAMPLES = 10_000
+
+
+class ForecastService:
+    """
+    Serve forecasts from one saved model, loaded once.
+
+    Concurrent requests are queued and micro-batched: the batcher waits up to max_wait_ms after
+    the first request (or until max_batch requests are queued) and answers the whole group with a
+    single ForecastEngine call on a dedicated inference thread.
+
+    Args:
+        model_dir: Artifact directory written by src.model.save_artifact.
+        max_batch: Most requests answered by one inference call.
+        max_wait_ms: Longest a request waits for others to join its batch.
+        max_steps: Most steps one request may ask for.
+    """
+
+    def __init__(self, model_dir, max_batch=64, max_wait_ms=5.0, max_steps=168):
+        model, self.metadata = load_artifact(model_dir, compile=False)
+        self.engine = ForecastEngine(model, batch_size=max_batch)
+        self.window_size = self.metadata["window_size"]
+        self.horizon = self.metadata["horizon"]
+        self.n_features = self.metadata["input_shape"][-1]
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_steps = max_steps
+        # TensorFlow calls stay on one thread; the event loop only queues and replies
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        self._queue = None
+        self._batcher = None
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.requests = 0
+        self.batches = 0
+
+    def _scale(self, features):
+        return (features - self.metadata["X_min"]) / (self.metadata["X_max"] - self.metadata["X_min"])
+
+    def _unscale(self, y):
+        return y * (self.metadata["y_max"] - self.metadata["y_min"]) + self.metadata["y_min"]
+
+    def prepare(self, body):
+        """
+        Validate a request body and turn it into a scaled model input.
+
+        Args:
+            body: dict with either "features" (rows of raw model inputs, oldest first) or
+                  "timestamps" (ISO strings, for models whose inputs are the time features),
+                  plus an optional "steps" (defaults to the model horizon). Rolling a one-step
+                  model forward needs the inputs of the steps ahead: "future_features" (steps
+                  rows of raw inputs) with "features", or at least two evenly spaced timestamps.
+
+        Returns:
+            window: (window_size, n_features) float32 array.
+            steps: Number of steps to forecast.
+            future: (steps, n_features) scaled inputs for autoregressive steps, or None.
+        """
+        if not isinstance(body, dict):
+            raise ValueError("body must be a JSON object")
+        steps = int(body.get("steps", self.horizon))
+        if not 1 <= steps <= self.max_steps:
+            raise ValueError(f"steps must be between 1 and {self.max_steps}")
+        if self.horizon > 1 and steps != self.horizon:
+            raise ValueError(f"this model forecasts exactly {self.horizon} steps")
+
+        future = None
+        if "timestamps" in body:
+            timestamps = np.array(body["timestamps"], dtype="datetime64[m]")
+            encoding = encode_time(timestamps)
+            features = np.stack([encoding[col] for col in TIME_FEATURES], axis=-1)
+            if self.horizon == 1 and steps > 1 and len(timestamps) > 1:
+                step = timestamps[-1] - timestamps[-2]
+                future = future_time_features(timestamps[-1], steps, int(step.astype(int)),
+                                              self.metadata["X_min"], self.metadata["X_max"])
+        elif "features" in body:
+            features = np.asarray(body["features"], dtype=np.float64)
+            if "future_features" in body:
+                future = np.asarray(body["future_features"], dtype=np.float64)
+                if future.shape != (steps, self.n_features):
+                    raise ValueError(f"future_features must be {steps} rows of {self.n_features} features")
+                future = self._scale(future).astype(np.float32)
+        else:
+            raise ValueError("body needs 'features' or 'timestamps'")
+
+        if features.ndim != 2 or features.shape[1] != self.n_features:
+            raise ValueError(f"expected rows of {self.n_features} features")
+        if self.horizon == 1 and steps > 1 and future is None:
+            # repeating the last row would forecast the same hour over and over
+            raise ValueError("steps > 1 needs 'future_features' or at least two timestamps")
+        if len(features) < self.window_size:
+            raise ValueError(f"need at least {self.window_size} rows, got {len(features)}")
+        window = self._scale(features[-self.window_size:]).astype(np.float32)
+        return window, steps, future
+
+    def _infer(self, steps, windows, futures):
+        windows = np.stack(windows)
+        if self.horizon > 1 or steps == 1:
+            return self.engine.direct(windows)
+        return self.engine.autoregressive(windows, steps, np.stack(futures))
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # one inference call per distinct step count in the batch
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+            for steps, items in groups.items():
+                self.batches += 1
+                try:
+                    preds = await loop.run_in_executor(self._pool, self._infer, steps,
+                                                       [item[0] for item in items], [item[2] for item in items])
+                except Exception as error:
+                    for item in items:
+                        if not item[3].done():
+                            item[3].set_exception(error)
+                    continue
+                for item, pred in zip(items, preds):
+                    if not item[3].done():
+                        item[3].set_result(pred)
+
+    async def forecast(self, body):
+        """
+        Forecast for one request, batched with any concurrent ones.
+
+        Args:
+            body: Request dict, see prepare.
+
+        Returns:
+            forecast: List of forecast values in original units.
+        """
+        window, steps, future = self.prepare(body)
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+        result = asyncio.get_running_loop().create_future()
+        await self._queue.put((window, steps, future, result))
+        return self._unscale(np.ravel(await result)).tolist()
+
+    def stats(self):
+        latencies = np.asarray(self.latencies) * 1000
+        stats = {"requests": self.requests, "batches": self.batches,
+                 "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0}
+        if len(latencies):
+            stats["p50_ms"] = round(float(np.percentile(latencies, 50)), 3)
+            stats["p99_ms"] = round(float(np.percentile(latencies, 99)), 3)
+        return stats
+
+    def close(self):
+        if self._batcher is not None and not self._batcher.done():
+            self._batcher.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_request(self, method, path, body):
+        """
+        Route one HTTP request.
+
+        Args:
+            method: HTTP method.
+            path: Request path.
+            body: Raw request body bytes.
+
+        Returns:
+            (status code, JSON-serialisable body)
+        """
+        if path == "/health":
+            return 200, {"status": "ok", "window_size": self.window_size, "horizon": self.horizon, **self.stats()}
+        if path != "/forecast":
+            return 404, {"error": f"unknown endpoint {path}"}
+        if method != "POST":
+            return 405, {"error": "only POST is supported"}
+
+        start = time.perf_counter()
+        try:
+            forecast = await self.forecast(json.loads(body or b"{}"))
+        except (ValueError, TypeError) as error:
+            return 400, {"error": str(error)}
+        except Exception as error:
+            return 500, {"error": str(error)}
+        elapsed = time.perf_counter() - start
+        self.requests += 1
+        self.latencies.append(elapsed)
+        return 200, {"forecast": forecast, "latency_ms": round(elapsed * 1000, 3)}
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serve a single HTTP/1.x request and close the connection.
+        """
+        try:
+            parts = (await reader.readline()).decode("latin-1").split()
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value.strip() or 0)
+            if len(parts) < 2:
+                status, body = 400, {"error": "malformed request line"}
+            elif length > MAX_BODY:
+                status, body = 413, {"error": "request body too large"}
+            else:
+                status, body = await self.handle_request(parts[0], parts[1].split("?")[0],
+                                                         await reader.readexactly(length))
+            payload = json.dumps(body).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + payload
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service, host="127.0.0.1", port=8766, socket_path=None):
+    if socket_path:
+        server = await asyncio.start_unix_server(service.handle_connection, path=socket_path)
+        address = socket_path
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        address = f"http://{host}:{server.sockets[0].getsockname()[1]}"
+    print(f"Forecast service listening on {address}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve temperature forecasts from a saved weather LSTM.")
+    parser.add_argument("--model-dir", default="models/weather_lstm", help="artifact written by main.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--socket", default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-batch", type=int, default=64, help="most requests per inference call")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="longest a request waits to be batched")
+    parser.add_argument("--max-steps", type=int, default=168, help="most forecast steps per request")
+    args = parser.parse_args(argv)
+
+    if args.max_steps < 1:
+        parser.error("--max-steps must be at least 1")
+    service = ForecastService(args.model_dir, args.max_batch, args.max_wait_ms, args.max_steps)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+    except OSError as error:
+        print(error, file=sys.stderr)
+        return 2
+    finally:
+        print(json.dumps(service.stats()))
+        service.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
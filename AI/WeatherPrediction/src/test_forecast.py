@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+from forecast import TIME_FEATURES, ForecastEngine, encode_time, future_time_features  # noqa: E402
+
+# predicts the time_sin column of the newest window row, so its outputs trace the inputs it was fed
+last_time_sin = tf.keras.Sequential([tf.keras.Input((24, 4)), tf.keras.layers.Lambda(lambda x: x[:, -1, 2:3])])
+# predicts the newest value of the first column, which holds the target
+last_target = tf.keras.Sequential([tf.keras.Input((24, 4)), tf.keras.layers.Lambda(lambda x: x[:, -1, 0:1] + 1)])
+
+def encoded(timestamps):
+    encoding = encode_time(np.array(timestamps, dtype="datetime64[m]"))
+    return np.stack([encoding[col] for col in TIME_FEATURES], axis=-1).astype(np.float32)
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_shared_encoding_import_leaves_sys_path_alone():
+    import importlib
+    import sys
+    path = list(sys.path)
+    sys.modules.pop("src.time_encoding", None)
+    importlib.import_module("src.time_encoding")
+    assert sys.path == path
+
+def test_future_time_features_are_the_following_hours():
+    features = future_time_features("2012-12-31T22:00", 3, 60)
+    expected = encoded(["2012-12-31T23:00", "2013-01-01T00:00", "2013-01-01T01:00"])
+    np.testing.assert_allclose(features, expected, atol=1e-6)
+
+def test_future_time_features_scaled_like_inputs():
+    X_min, X_max = np.full(4, -1.0), np.full(4, 1.0)
+    features = future_time_features("2012-06-01T12:00", 2, 60, X_min, X_max)
+    np.testing.assert_allclose(features, (future_time_features("2012-06-01T12:00", 2, 60) + 1) / 2, atol=1e-6)
+
+def test_rollout_inputs_advance_with_future_features():
+    hours = np.datetime64("2012-06-01T00:00") + np.arange(24) * np.timedelta64(60, "m")
+    window = encoded(hours)[None]
+    future = future_time_features(hours[-1], 6, 60)
+    preds = ForecastEngine(last_time_sin).autoregressive(window, 6, future)
+    # step 0 sees the window as given, step i the row for hour i slid in after it
+    np.testing.assert_allclose(preds[0], np.r_[window[0, -1, 2], future[:5, 2]], atol=1e-6)
+    assert len(np.unique(np.round(preds, 6))) == 6
+
+def test_rollout_without_future_features_repeats_last_row():
+    window = encoded(np.datetime64("2012-06-01T00:00") + np.arange(24) * np.timedelta64(60, "m"))[None]
+    preds = ForecastEngine(last_time_sin).autoregressive(window, 4)
+    np.testing.assert_allclose(preds[0], np.full(4, window[0, -1, 2]), atol=1e-6)
+
+def test_rollout_feeds_predictions_back_into_target():
+    window = np.zeros((1, 24, 4), dtype=np.float32)
+    preds = ForecastEngine(last_target).autoregressive(window, 4, np.zeros((4, 4)), target_index=0)
+    np.testing.assert_allclose(preds[0], [1, 2, 3, 4])
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
@@ -0,0 +1,108 @@
+import json
+import os
+import numpy as np
+import pytest
+
+from ingest import META_FILE, _column_path, ingest_directory, open_series, open_store, read_meta
+
+header = "Date/Time,Temp_C,Rel Hum_%,Weather\n"
+
+def rows(start_hour, count, temp):
+    return "".join(f"1/1/2012 {hour}:00,{temp + hour},80,Fog\n" for hour in range(start_hour, start_hour + count))
+
+# -----------------------------
+# Fixture with two station files
+# -----------------------------
+@pytest.fixture
+def source(tmp_path):
+    directory = tmp_path / "stations"
+    directory.mkdir()
+    (directory / "north.csv").write_text(header + rows(0, 5, 0))
+    (directory / "south.csv").write_text(header + rows(0, 3, 10))
+    return directory
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_ingest_and_station_filter(source, tmp_path):
+    store = str(tmp_path / "store")
+    meta = ingest_directory(str(source), store, chunk_rows=2)
+    assert meta["rows"] == 8
+    assert meta["stations"] == ["north", "south"]
+    south = open_store(store, ["Temp_C", "minute"], station="south")
+    assert south["Temp_C"].tolist() == [10, 11, 12]
+    assert south["minute"].tolist() == [0, 60, 120]
+    assert len(open_store(store, ["Temp_C"])["Temp_C"]) == 8
+
+def test_rerun_skips_unchanged_and_appends_new_rows(source, tmp_path):
+    store = str(tmp_path / "store")
+    ingest_directory(str(source), store, chunk_rows=2)
+    assert ingest_directory(str(source), store)["rows"] == 8
+    with open(source / "north.csv", "a") as f:
+        f.write(rows(5, 2, 0))
+    meta = ingest_directory(str(source), store, chunk_rows=2)
+    assert meta["rows"] == 10
+    assert open_store(store, ["Temp_C"], station="north")["Temp_C"].tolist() == [0, 1, 2, 3, 4, 5, 6]
+
+def test_truncated_or_edited_file_fails(source, tmp_path):
+    store = str(tmp_path / "store")
+    ingest_directory(str(source), store)
+    north = source / "north.csv"
+    north.write_text(header + rows(0, 3, 0))
+    with pytest.raises(ValueError, match="north.csv"):
+        ingest_directory(str(source), store)
+    # same length, an already stored reading changed
+    north.write_text(header + rows(0, 5, 0).replace("1/1/2012 1:00,1,", "1/1/2012 1:00,9,") + rows(5, 1, 0))
+    with pytest.raises(ValueError, match="north.csv"):
+        ingest_directory(str(source), store)
+    assert read_meta(store)["rows"] == 8
+
+def test_bad_dates_are_dropped_and_counted(tmp_path):
+    directory = tmp_path / "stations"
+    directory.mkdir()
+    (directory / "north.csv").write_text(header + rows(0, 2, 0) + "not a date,5,80,Fog\n" + rows(2, 2, 0))
+    store = str(tmp_path / "store")
+    meta = ingest_directory(str(directory), store)
+    assert meta["rows"] == 4
+    assert meta["files"]["north.csv"]["dropped"] == 1
+    assert open_store(store, ["Temp_C"])["Temp_C"].tolist() == [0, 1, 2, 3]
+    with open(directory / "north.csv", "a") as f:
+        f.write(rows(4, 1, 0))
+    assert ingest_directory(str(directory), store)["rows"] == 5
+
+def test_stray_columns_without_meta_are_discarded(source, tmp_path):
+    store = tmp_path / "store"
+    store.mkdir()
+    # a run that crashed before writing meta.json left partial column files behind
+    (store / "Temp_C.bin").write_bytes(b"\0" * 12)
+    meta = ingest_directory(str(source), str(store))
+    for name, dtype in meta["columns"].items():
+        assert os.path.getsize(_column_path(str(store), name)) == meta["rows"] * np.dtype(dtype).itemsize
+
+def test_schema_is_committed_before_first_append(source, tmp_path, monkeypatch):
+    import ingest
+    store = str(tmp_path / "store")
+    def crash(*args):
+        raise RuntimeError("crash")
+    monkeypatch.setattr(ingest, "encode_chunk", crash)
+    with pytest.raises(RuntimeError):
+        ingest_directory(str(source), store)
+    with open(os.path.join(store, META_FILE)) as f:
+        assert json.load(f)["rows"] == 0
+    monkeypatch.undo()
+    assert ingest_directory(str(source), store)["rows"] == 8
+    assert read_meta(store)["rows"] == 8
+
+def test_open_series_requires_station(source, tmp_path):
+    store = str(tmp_path / "store")
+    ingest_directory(str(source), store)
+    with pytest.raises(ValueError):
+        open_series(store, ["Temp_C"])
+    assert open_series(store, ["Temp_C"], station="north")["Temp_C"].tolist() == [0, 1, 2, 3, 4]
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+from model import WindowBatches, build_model, load_artifact, make_datasets, save_artifact, train_model  # noqa: E402
+from windows import make_windows, split_windows  # noqa: E402
+
+rng = np.random.default_rng(0)
+series = rng.random((200, 5), dtype=np.float32)
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_window_batches_cover_every_window_once():
+    X, y = make_windows(series[:, :-1], series[:, -1], 24)
+    batches = WindowBatches(X, y, batch_size=32, shuffle=True)
+    assert len(batches) == -(-len(X) // 32)
+    seen = np.concatenate([batches[i][1] for i in range(len(batches))])
+    np.testing.assert_array_equal(np.sort(seen), np.sort(y))
+    X_batch, _ = batches[0]
+    assert X_batch.shape == (32, 24, 4) and X_batch.flags["C_CONTIGUOUS"]
+
+def test_train_model_on_window_views():
+    X, y = make_windows(series[:, :-1], series[:, -1], 24)
+    X_train, X_val, y_train, y_val = split_windows(X, y)
+    model = build_model((24, 4))
+    history = train_model(model, X_train, y_train, X_val, y_val, epochs=1, batch_size=32)
+    assert len(history.history["loss"]) == 1
+
+@pytest.mark.parametrize("horizon", [1, 3])
+def test_make_datasets_matches_window_views(horizon):
+    X, y = make_windows(series[:, :-1], series[:, -1], 24, horizon)
+    X_train, X_val, y_train, y_val = split_windows(X, y)
+    train_ds, val_ds = make_datasets(series, 24, horizon, batch_size=16)
+    for ds, X_ref, y_ref in ((train_ds, X_train, y_train), (val_ds, X_val, y_val)):
+        X_ds, y_ds = zip(*((xb.numpy(), yb.numpy()) for xb, yb in ds))
+        np.testing.assert_array_equal(np.concatenate(X_ds), X_ref)
+        np.testing.assert_array_equal(np.concatenate(y_ds), y_ref)
+
+def test_make_datasets_reshuffles_each_epoch():
+    train_ds, _ = make_datasets(series, 24, batch_size=200, shuffle=True)
+    first, second = (next(iter(train_ds))[1].numpy() for _ in range(2))
+    assert not np.array_equal(first, second)
+    np.testing.assert_array_equal(np.sort(first), np.sort(second))
+
+def test_save_artifact_replaces_previous_artifact(tmp_path):
+    directory = str(tmp_path / "weather_lstm")
+    save_artifact(build_model((24, 4)), directory, np.zeros(4), np.ones(4), 0.0, 1.0, 24)
+    save_artifact(build_model((12, 4)), directory, np.zeros(4), np.ones(4), 0.0, 1.0, 12)
+    model, metadata = load_artifact(directory, compile=False)
+    assert metadata["window_size"] == 12 and model.input_shape == (None, 12, 4)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["weather_lstm"]
+
+def test_interrupted_save_keeps_previous_artifact(tmp_path, monkeypatch):
+    directory = str(tmp_path / "weather_lstm")
+    save_artifact(build_model((24, 4)), directory, np.zeros(4), np.ones(4), 0.0, 1.0, 24)
+    model = build_model((12, 4))
+    def crash(path, *args, **kwargs):
+        open(path, "wb").write(b"partial")
+        raise OSError("disk full")
+    monkeypatch.setattr(model, "save", crash)
+    with pytest.raises(OSError):
+        save_artifact(model, directory, np.zeros(4), np.ones(4), 0.0, 1.0, 12)
+    restored, metadata = load_artifact(directory, compile=False)
+    assert metadata["window_size"] == 24 and restored.input_shape == (None, 24, 4)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["weather_lstm"]
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
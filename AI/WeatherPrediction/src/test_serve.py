@@ -0,0 +1,94 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+from src.model import save_artifact  # noqa: E402
+from src.serve import ForecastService  # noqa: E402
+
+hours = [f"2012-06-01T{hour:02d}:00" for hour in range(24)]
+features = np.linspace(-1, 1, 24 * 4).reshape(24, 4).tolist()
+
+# -----------------------------
+# Helpers
+# -----------------------------
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("artifact"))
+    model = tf.keras.Sequential([tf.keras.Input((24, 4)), tf.keras.layers.Flatten(), tf.keras.layers.Dense(1)])
+    save_artifact(model, directory, np.full(4, -1.0), np.full(4, 1.0), 0.0, 10.0, window_size=24)
+    return directory
+
+@pytest.fixture
+def service(model_dir):
+    service = ForecastService(model_dir, max_batch=16, max_wait_ms=50)
+    yield service
+    service.close()
+
+async def post(service, body):
+    return await service.handle_request("POST", "/forecast", json.dumps(body).encode())
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+@pytest.mark.parametrize("body, message", [
+    ([], "JSON object"),
+    ({"timestamps": hours, "steps": 0}, "between 1 and 168"),
+    ({"timestamps": hours, "steps": 10 ** 8}, "between 1 and 168"),
+    ({"steps": 2}, "'features' or 'timestamps'"),
+    ({"features": [[0, 0, 0]] * 24}, "rows of 4 features"),
+    ({"features": features[:10]}, "at least 24 rows"),
+])
+def test_prepare_rejects_bad_requests(service, body, message):
+    with pytest.raises(ValueError, match=message):
+        service.prepare(body)
+
+def test_prepare_scales_last_window(service):
+    window, steps, future = service.prepare({"features": [[0, 0, 0, 0]] * 5 + features})
+    np.testing.assert_allclose(window, (np.array(features) + 1) / 2, atol=1e-6)
+    assert (steps, future) == (1, None)
+
+def test_multi_step_features_need_future_rows(service):
+    with pytest.raises(ValueError, match="future_features"):
+        service.prepare({"features": features, "steps": 3})
+    with pytest.raises(ValueError, match="future_features"):
+        service.prepare({"timestamps": hours[-1:], "steps": 3})
+    with pytest.raises(ValueError, match="3 rows of 4"):
+        service.prepare({"features": features, "steps": 3, "future_features": features[:2]})
+
+def test_future_features_drive_the_rollout(service):
+    future = [[0, 0, value, 0] for value in (-1, 0, 1)]
+    status, body = asyncio.run(post(service, {"features": features, "steps": 3, "future_features": future}))
+    assert status == 200
+    assert len(set(np.round(body["forecast"], 6))) == 3
+
+def test_bad_request_is_400(service):
+    status, body = asyncio.run(post(service, {"features": features[:10]}))
+    assert status == 400 and "24 rows" in body["error"]
+
+def test_concurrent_requests_are_batched(service):
+    async def client():
+        return await asyncio.gather(*(post(service, {"timestamps": hours, "steps": 3}) for _ in range(8)))
+    responses = asyncio.run(client())
+    assert all(status == 200 and len(body["forecast"]) == 3 for status, body in responses)
+    assert len({tuple(body["forecast"]) for _, body in responses}) == 1
+    assert service.requests == 8
+    assert service.stats()["mean_batch_size"] > 1
+
+def test_health_reports_latency_percentiles(service):
+    async def client():
+        for _ in range(3):
+            await post(service, {"features": features})
+        return await service.handle_request("GET", "/health", b"")
+    status, body = asyncio.run(client())
+    assert status == 200
+    assert body["requests"] == 3 and body["window_size"] == 24
+    assert 0 < body["p50_ms"] <= body["p99_ms"]
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from windows import make_windows, split_windows
+
+series = np.arange(60, dtype=np.float32).reshape(20, 3)
+
+# -----------------------------
+# Reference: the loops make_windows replaced
+# -----------------------------
+def loop_windows(data, window_size, horizon=1):
+    X, y = [], []
+    for i in range(len(data) - window_size - horizon + 1):
+        X.append(data[i:i+window_size, :-1])
+        y.append(data[i+window_size, -1] if horizon == 1 else data[i+window_size:i+window_size+horizon, -1])
+    return np.array(X), np.array(y)
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+@pytest.mark.parametrize("horizon", [1, 4])
+def test_make_windows_matches_loop(horizon):
+    X, y = make_windows(series[:, :-1], series[:, -1], 5, horizon)
+    X_loop, y_loop = loop_windows(series, 5, horizon)
+    np.testing.assert_array_equal(X, X_loop)
+    np.testing.assert_array_equal(y, y_loop)
+
+def test_make_windows_is_a_view():
+    X, _ = make_windows(series[:, :-1], series[:, -1], 5)
+    assert np.shares_memory(X, series)
+
+def test_make_windows_too_short():
+    with pytest.raises(ValueError):
+        make_windows(series[:4, :-1], series[:4, -1], 5)
+
+@pytest.mark.parametrize("test_size", [0.2, 0.25, 0.33])
+def test_split_matches_train_test_split(test_size):
+    train_test_split = pytest.importorskip("sklearn.model_selection").train_test_split
+    X, y = make_windows(series[:, :-1], series[:, -1], 3)
+    expected = train_test_split(np.asarray(X), np.asarray(y), test_size=test_size, shuffle=False)
+    for part, reference in zip(split_windows(X, y, test_size), expected):
+        np.testing.assert_array_equal(part, reference)
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
@@ -0,0 +1,27 @@
+import importlib.util
+import os
+import sys
+
+# -----------------------------
+# Shared time encoding
+# -----------------------------
+# The encoding and its table I/O live next to the table generator in ../../TimeSeriesDataNormalization.
+# The modules there are loaded by file path, so importing them leaves sys.path untouched.
+SHARED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "TimeSeriesDataNormalization")
+
+
+def _load(name):
+    # reuse the module when it is already imported, so there is one copy (and one lru_cache) per process
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SHARED_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+encode_time = _load("time_features").encode_time
+lookup_encoding = _load("time_features").lookup_encoding
+load_encoding = _load("encoding_io").load_encoding
+resolve_encoding_path = _load("encoding_io").resolve_encoding_path
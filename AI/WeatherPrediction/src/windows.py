@@ -0,0 +1,54 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def make_windows(features, target, window_size: int, horizon: int = 1):
+    """
+    Build LSTM input windows and their targets as strided views of the series.
+
+    Window i covers rows i .. i+window_size-1 of features, and its target is the next
+    `horizon` values of target. Nothing is copied, so memory stays O(rows) however large
+    window_size is; copy a slice when contiguous data is needed, and train through
+    src.model.WindowBatches so model.fit only materializes one batch at a time.
+
+    Args:
+        features: Array of shape (rows, n_features).
+        target: Array of shape (rows,) or (rows, 1).
+        window_size: Number of past rows in each window.
+        horizon: Number of future target values per window.
+
+    Returns:
+        X: Read-only view of shape (n, window_size, n_features).
+        y: Read-only view of shape (n,) (or (n, 1) for a 2D target) when horizon is 1,
+           otherwise (n, horizon).
+    """
+    n = len(features) - window_size - horizon + 1
+    if n <= 0:
+        raise ValueError(f"Need more than {window_size + horizon - 1} rows for window_size={window_size}, "
+                         f"horizon={horizon}")
+    # sliding_window_view puts the window axis last: (rows-window+1, n_features, window) -> swap the last two
+    X = sliding_window_view(features, window_size, axis=0)[:n].swapaxes(1, 2)
+    if horizon == 1:
+        y = target[window_size:window_size + n]
+    else:
+        y = sliding_window_view(np.ravel(target), horizon)[window_size:window_size + n]
+    return X, y
+
+
+def split_windows(X, y, test_size: float = 0.2):
+    """
+    Chronological train/validation split by slicing, so views stay views.
+
+    Matches train_test_split(shuffle=False): the validation part gets ceil(test_size * n) windows.
+
+    Args:
+        X, y: Windows and targets from make_windows.
+        test_size: Fraction of windows for validation.
+
+    Returns:
+        X_train, X_val, y_train, y_val
+    """
+    split = len(X) - math.ceil(test_size * len(X))
+    return X[:split], X[split:], y[:split], y[split:]
+
@@ -1,10 +1,10 @@
-import numpy as np
 import matplotlib.pyplot as plt
 from tensorflow.keras.models import Sequential # type: ignore
 from tensorflow.keras.layers import LSTM, Dense # type: ignore
 from sklearn.preprocessing import MinMaxScaler # type: ignore
 import pandas as pd
-import numpy as np
+from src.model import WindowBatches
+from src.windows import make_windows
 
 # define functions
 def create_sequences(X, y, window_size):
@@ -16,13 +16,9 @@ def create_sequences(X, y, window_size):
         - window_size | Number
 
       Returns:
-        - sequence_array | numpy.array
+        - sequence_array | numpy.array (strided views, see src.windows.make_windows)
     """
-    X_seq, y_seq = [], []
-    for i in range(len(X) - window_size):
-        X_seq.append(X[i:i+window_size])
-        y_seq.append(y[i+window_size])
-    return np.array(X_seq), np.array(y_seq)
+    return make_windows(X, y, window_size)
 
 
 # load and parse csv
@@ -59,8 +55,7 @@ model.add(Dense(1))
 model.compile(optimizer='adam', loss='mse', metrics=['mae'])
 
 history = model.fit(
-    X_train, y_train,
-    validation_data=(X_val, y_val),
-    epochs=50,
-    batch_size=32
+    WindowBatches(X_train, y_train, 32, shuffle=True),
+    validation_data=WindowBatches(X_val, y_val, 32),
+    epochs=50
 )
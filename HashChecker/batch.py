@@ -0,0 +1,227 @@
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import DigestCache
+from checker import DEFAULT_BLOCK_SIZE, GREEN, RED, RESET, Hasher, UnsupportedAlgorithm, digests_match, normalize_algorithm
+
+# hex digest length -> algorithm, used when a manifest does not name its algorithm
+DIGEST_LENGTHS = {32: "md5", 40: "sha1", 64: "sha256", 128: "sha512"}
+
+
+class ManifestError(Exception):
+    pass
+
+
+class ManifestEntry:
+    def __init__(self, file_path, expected, algorithm):
+        self.file_path = file_path
+        self.expected = expected
+        self.algorithm = algorithm
+
+
+class BatchResult:
+    def __init__(self, file_path, algorithm, expected="", digest="", error=""):
+        self.file_path = file_path
+        self.algorithm = algorithm
+        self.expected = expected
+        self.digest = digest
+        self.error = error
+
+    @property
+    def ok(self):
+        return not self.error and (not self.expected or digests_match(self.expected, self.digest))
+
+
+def parse_manifest(manifest_path, algorithm=None):
+    """Description: Read a manifest in sha256sum/md5sum format ("<digest>  <path>" or "<digest> *<path>").
+    Args:
+        - manifest_path | String
+        - algorithm | String, optional. Inferred from the digest length when omitted.
+
+    Returns:
+        - List: ManifestEntry objects, with relative paths resolved against the manifest's directory
+
+    Raises:
+        - Exceptions:
+            - ManifestError | Raises custom ManifestError when a line cannot be parsed.
+            - UnsupportedAlgorithm | Raises custom UnsupportedAlgorithm error when an algorithm is not supported.
+
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    if algorithm:
+        algorithm = normalize_algorithm(algorithm)
+    entries = []
+    with open(manifest_path, "r", encoding="utf-8") as manifest:
+        for line_number, line in enumerate(manifest, start=1):
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            parts = line.split(" ", 1)
+            if len(parts) != 2 or not parts[1] or parts[1][0] not in " *":
+                raise ManifestError(f"{manifest_path}:{line_number}: expected '<digest>  <path>'")
+            expected = parts[0].lower()
+            file_path = parts[1][1:]
+            entry_algorithm = algorithm or DIGEST_LENGTHS.get(len(expected))
+            if entry_algorithm is None:
+                raise ManifestError(f"{manifest_path}:{line_number}: cannot infer algorithm from digest length")
+            entries.append(ManifestEntry(os.path.join(base_dir, file_path), expected, entry_algorithm))
+    return entries
+
+
+def list_files(directory):
+    """Description: Recursively list the regular files of a directory in a stable order.
+    Args:
+        - directory | String
+
+    Returns:
+        - List: file paths
+
+    """
+    files = []
+    for root, dirs, names in os.walk(directory):
+        dirs.sort()
+        for name in sorted(names):
+            file_path = os.path.join(root, name)
+            if os.path.isfile(file_path):
+                files.append(file_path)
+    return files
+
+
+def hash_entry(entry, block_size=DEFAULT_BLOCK_SIZE, cache=None):
+    """Description: Hash a single manifest entry, capturing I/O errors in the result instead of raising.
+    Args:
+        - entry | ManifestEntry
+        - block_size | Number
+        - cache | DigestCache, optional
+
+    Returns:
+        - BatchResult
+
+    """
+    request = Hasher(block_size=block_size, cache=cache)
+    request.file_path = entry.file_path
+    request.expected = entry.expected
+    try:
+        digest = request.get_digests([entry.algorithm])[entry.algorithm]
+    except OSError as error:
+        return BatchResult(entry.file_path, entry.algorithm, entry.expected, error=error.strerror or str(error))
+    return BatchResult(entry.file_path, entry.algorithm, entry.expected, digest)
+
+
+def run_batch(entries, workers=None, block_size=DEFAULT_BLOCK_SIZE, cache=None):
+    """Description: Hash many files concurrently. hashlib releases the GIL on large buffers so threads scale across cores.
+    Args:
+        - entries | Iterable of ManifestEntry
+        - workers | Number of threads, defaults to the number of CPUs
+        - block_size | Number
+        - cache | DigestCache, optional
+
+    Returns:
+        - List: BatchResult objects in the same order as entries
+
+    """
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(lambda entry: hash_entry(entry, block_size, cache), entries))
+
+
+def verify_manifest(manifest_path, algorithm=None, workers=None, block_size=DEFAULT_BLOCK_SIZE, cache=None):
+    """Description: Verify every file listed in a manifest.
+    Args:
+        - manifest_path | String
+        - algorithm | String, optional
+        - workers | Number, optional
+        - block_size | Number
+        - cache | DigestCache, optional
+
+    Returns:
+        - List: BatchResult objects
+
+    """
+    return run_batch(parse_manifest(manifest_path, algorithm), workers, block_size, cache)
+
+
+def hash_directory(directory, algorithm, workers=None, block_size=DEFAULT_BLOCK_SIZE, cache=None):
+    """Description: Hash every file below a directory.
+    Args:
+        - directory | String
+        - algorithm | String
+        - workers | Number, optional
+        - block_size | Number
+        - cache | DigestCache, optional
+
+    Returns:
+        - List: BatchResult objects without expected digests
+
+    """
+    algorithm = normalize_algorithm(algorithm)
+    entries = [ManifestEntry(file_path, "", algorithm) for file_path in list_files(directory)]
+    return run_batch(entries, workers, block_size, cache)
+
+
+def format_manifest_line(result, base_dir):
+    """Description: Format a result as a sha256sum-compatible manifest line."""
+    return f"{result.digest}  {os.path.relpath(result.file_path, base_dir).replace(os.sep, '/')}"
+
+
+def print_summary(results, base_dir, show_passed=True):
+    """Description: Print a per-file status followed by a pass/fail summary.
+    Args:
+        - results | List of BatchResult
+        - base_dir | String, paths are printed relative to this directory
+        - show_passed | Boolean
+
+    Returns:
+        - Number: the number of failed files
+
+    """
+    failed = 0
+    for result in results:
+        name = os.path.relpath(result.file_path, base_dir)
+        if result.error:
+            failed += 1
+            print(f"{name}: {RED}FAILED open or read{RESET} ({result.error})")
+        elif not result.ok:
+            failed += 1
+            print(f"{name}: {RED}FAILED{RESET}")
+        elif show_passed:
+            print(f"{name}: {GREEN}OK{RESET}")
+    colour = RED if failed else GREEN
+    print(f"{colour}{len(results) - failed} passed, {failed} failed, {len(results)} total.{RESET}")
+    return failed
+
+
+def batch_main(args):
+    """Description: Run the non-interactive batch mode from parsed command line arguments.
+    Args:
+        - args | argparse.Namespace
+
+    Returns:
+        - Number: process exit status, 0 when every file passed, 1 when any file failed, 2 on bad input
+
+    """
+    cache = None
+    try:
+        if not args.no_cache:
+            cache = DigestCache(args.cache, args.cache_max_entries)
+        if args.check:
+            results = verify_manifest(args.check, args.algorithm, args.workers, args.block_size, cache)
+            failed = print_summary(results, os.path.dirname(os.path.abspath(args.check)), not args.quiet)
+        else:
+            results = hash_directory(args.dir, args.algorithm or "sha256", args.workers, args.block_size, cache)
+            failed = 0
+            for result in results:
+                if result.error:
+                    failed += 1
+                    print(f"{result.file_path}: {result.error}", file=sys.stderr)
+                else:
+                    print(format_manifest_line(result, args.dir))
+    except (ManifestError, UnsupportedAlgorithm, OSError, sqlite3.Error) as error:
+        print(f"{RED}{error}{RESET}", file=sys.stderr)
+        return 2
+    finally:
+        if cache is not None:
+            cache.close()
+    return 1 if failed else 0
+
@@ -0,0 +1,159 @@
+import argparse
+import csv
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+from checker import DEFAULT_BLOCK_SIZE, SUPPORTED_ALGORITHMS, Hasher, normalize_algorithm
+
+STRATEGIES = ("read4096", "readinto", "mmap")
+
+
+def legacy_digest(file_path, algorithm, progress=None):
+    """Description: The original small-chunk read loop, kept as the benchmark baseline.
+    Args:
+        - file_path | String
+        - algorithm | String
+        - progress | Optional callback(bytes_processed, elapsed_seconds)
+
+    Returns:
+        - String: the hex digest of the file
+
+    """
+    hash_obj = hashlib.new(algorithm)
+    start = time.perf_counter()
+    total = 0
+    with open(file_path, "rb") as file:
+        for bytes_blk in iter(lambda: file.read(4096), b""):
+            hash_obj.update(bytes_blk)
+            total += len(bytes_blk)
+            if progress is not None:
+                progress(total, time.perf_counter() - start)
+    return hash_obj.hexdigest()
+
+
+def write_sample_file(directory, size_mb):
+    """Description: Write a file of random bytes to benchmark against.
+    Args:
+        - directory | String
+        - size_mb | Number
+
+    Returns:
+        - String: the path of the sample file
+
+    """
+    file_path = os.path.join(directory, f"sample_{size_mb}mb.bin")
+    chunk = os.urandom(1024 * 1024)
+    with open(file_path, "wb") as file:
+        for _ in range(size_mb):
+            file.write(chunk)
+    return file_path
+
+
+class BlockTimer:
+    """Progress callback that keeps the last reported byte count and time."""
+
+    def __init__(self):
+        self.bytes_processed = 0
+        self.elapsed = 0.0
+        self.calls = 0
+
+    def __call__(self, bytes_processed, elapsed):
+        self.bytes_processed = bytes_processed
+        self.elapsed = elapsed
+        self.calls += 1
+
+
+def run_case(file_path, algorithm, strategy, block_size, repeat):
+    """Description: Hash a file several times with one strategy and keep the best run.
+    Args:
+        - file_path | String
+        - algorithm | String
+        - strategy | One of STRATEGIES
+        - block_size | Number, ignored by read4096
+        - repeat | Number
+
+    Returns:
+        - Dict: one benchmark result row
+
+    """
+    request = Hasher(block_size=block_size, use_mmap=strategy == "mmap")
+    request.file_path = file_path
+    best = None
+    for _ in range(repeat):
+        timer = BlockTimer()
+        start = time.perf_counter()
+        if strategy == "read4096":
+            legacy_digest(file_path, algorithm, timer)
+        else:
+            request.get_digests([algorithm], timer)
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best[0]:
+            best = (seconds, timer)
+    seconds, timer = best
+    return {
+        "algorithm": algorithm,
+        "strategy": strategy,
+        "block_size": 4096 if strategy == "read4096" else block_size,
+        "bytes": timer.bytes_processed,
+        "blocks": timer.calls,
+        "seconds": round(seconds, 6),
+        "mb_per_s": round(timer.bytes_processed / seconds / 1e6, 1) if seconds else 0.0,
+    }
+
+
+def parse_list(text, cast=str):
+    return [cast(item.strip()) for item in text.split(",") if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure hashing throughput per algorithm, block size and read strategy.")
+    parser.add_argument("--sizes", default="64,256", help="comma separated synthetic file sizes in MiB")
+    parser.add_argument("--algorithms", default=",".join(SUPPORTED_ALGORITHMS), help="comma separated algorithms")
+    parser.add_argument("--block-sizes", default=f"65536,{DEFAULT_BLOCK_SIZE},{8 * DEFAULT_BLOCK_SIZE}", help="comma separated block sizes in bytes")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES), help="comma separated subset of " + ", ".join(STRATEGIES))
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per case, the best is reported")
+    parser.add_argument("--dir", default=None, help="directory for the synthetic files (default: system temp directory)")
+    parser.add_argument("--csv", metavar="PATH", help="also write the results as CSV ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    algorithms = [normalize_algorithm(name) for name in parse_list(args.algorithms)]
+    strategies = parse_list(args.strategies)
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            parser.error(f"unknown strategy {strategy}")
+
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for size_mb in parse_list(args.sizes, int):
+            file_path = write_sample_file(directory, size_mb)
+            print(f"\n{size_mb} MiB file")
+            print(f"{'algorithm':>10} {'strategy':>10} {'block size':>11} {'MB/s':>10} {'seconds':>9}")
+            for algorithm in algorithms:
+                for strategy in strategies:
+                    # the legacy loop has a fixed block size
+                    block_sizes = [4096] if strategy == "read4096" else parse_list(args.block_sizes, int)
+                    for block_size in block_sizes:
+                        row = run_case(file_path, algorithm, strategy, block_size, args.repeat)
+                        row["size_mb"] = size_mb
+                        results.append(row)
+                        print(f"{algorithm:>10} {strategy:>10} {row['block_size']:>11} {row['mb_per_s']:>10.1f} {row['seconds']:>9.3f}")
+            os.remove(file_path)
+
+    if args.csv:
+        fields = ["size_mb", "algorithm", "strategy", "block_size", "bytes", "blocks", "seconds", "mb_per_s"]
+        output = sys.stdout if args.csv == "-" else open(args.csv, "w", newline="")
+        try:
+            writer = csv.DictWriter(output, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_ENTRIES = 100000
+
+
+def default_cache_path():
+    """Description: Return the per-user location of the digest cache database."""
+    if os.name == 'nt':
+        base_dir = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        base_dir = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base_dir, "hashchecker", "digests.sqlite3")
+
+
+class DigestCache:
+    """Persistent digest cache keyed on (device, inode, size, mtime_ns, algorithm).
+
+    A file whose identity and metadata have not changed since it was last hashed is
+    answered from the cache without being read. Lookups only read the database: the
+    last use of each hit is kept in memory and written back before eviction and on close.
+    The least recently used entries are evicted every max_entries // 10 stores, so the
+    cache may briefly hold up to that many entries more than max_entries.
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or default_cache_path()
+        self.max_entries = max_entries
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # the batch mode hashes on a thread pool, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL lets a commit skip rewriting the database file and syncing on every write
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._touched = {}
+        self._evict_every = max(1, max_entries // 10)
+        self._stores = 0
+        with self._connection:
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS digests (
+                    device INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    algorithm TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (device, inode, size, mtime_ns, algorithm)
+                )"""
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS digests_last_used ON digests (last_used)")
+
+    @staticmethod
+    def _key(identity, algorithm):
+        return (identity.st_dev, identity.st_ino, identity.st_size, identity.st_mtime_ns, algorithm)
+
+    def lookup(self, identity, algorithm):
+        """Description: Return the cached digest for a file.
+        Args:
+            - identity | os.stat_result of the file
+            - algorithm | String
+
+        Returns:
+            - String: the cached hex digest, or None when the file is not cached
+
+        """
+        key = self._key(identity, algorithm)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT digest FROM digests WHERE device=? AND inode=? AND size=? AND mtime_ns=? AND algorithm=?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+        return row[0]
+
+    def store(self, identity, algorithm, digest):
+        """Description: Remember the digest of a file, evicting the least recently used entries when full.
+        Args:
+            - identity | os.stat_result of the file
+            - algorithm | String
+            - digest | String
+
+        Returns:
+            - None
+
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._key(identity, algorithm) + (digest, time.time()),
+            )
+            # an inode that changed size or mtime has stale rows which are never looked up again
+            self._connection.execute(
+                "DELETE FROM digests WHERE device=? AND inode=? AND algorithm=? AND (size<>? OR mtime_ns<>?)",
+                (identity.st_dev, identity.st_ino, algorithm, identity.st_size, identity.st_mtime_ns),
+            )
+            self._touched.pop(self._key(identity, algorithm), None)
+            self._stores += 1
+            if self._stores % self._evict_every == 0:
+                self._evict()
+
+    def _flush_touched(self):
+        self._connection.executemany(
+            "UPDATE digests SET last_used=? WHERE device=? AND inode=? AND size=? AND mtime_ns=? AND algorithm=?",
+            [(last_used,) + key for key, last_used in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _evict(self):
+        # recent hits must count as recent before the oldest entries are picked
+        self._flush_touched()
+        count = self._connection.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        if count > self.max_entries:
+            self._connection.execute(
+                "DELETE FROM digests WHERE rowid IN (SELECT rowid FROM digests ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM digests")
+            self._touched.clear()
+
+    def close(self):
+        with self._lock, self._connection:
+            self._evict()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
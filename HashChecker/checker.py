@@ -1,45 +1,302 @@
+import argparse
 import hashlib
+import hmac
+import mmap
 import os
+import stat
+import sys
+import time
 
 RED = '\033[31m'
 GREEN = '\033[32m'
 RESET = '\033[0m'
 
+SUPPORTED_ALGORITHMS = ("sha1", "sha256", "sha512", "md5")
+DEFAULT_BLOCK_SIZE = 1024 * 1024  # 1 MiB
+
 class FileNotSpecified(Exception):
     pass
 
+class UnsupportedAlgorithm(Exception):
+    pass
+
+
+def normalize_algorithm(algorithm):
+    """Description: Normalize an algorithm name such as "SHA-256" to its hashlib name.
+    Args:
+        - algorithm | String
+
+    Returns:
+        - String: the normalized algorithm name
+
+    Raises: 
+        - Exceptions: 
+            - UnsupportedAlgorithm | Raises custom UnsupportedAlgorithm error when the algorithm is not supported.
+
+    """
+    name = algorithm.strip().lower().replace("-", "")
+    if name not in SUPPORTED_ALGORITHMS:
+        raise UnsupportedAlgorithm(f"Unsupported algorithm: {algorithm}")
+    return name
+
+
+def digests_match(expected, actual):
+    """Description: Compare two hex digests in constant time, ignoring case and surrounding whitespace.
+    Args:
+        - expected | String
+        - actual | String
+
+    Returns:
+        - Boolean: True when the digests are equal
+
+    """
+    expected = expected.strip().lower().encode("ascii", "replace")
+    actual = actual.strip().lower().encode("ascii", "replace")
+    return hmac.compare_digest(expected, actual)
+
+
+def update_from_file(file, hashes, block_size=DEFAULT_BLOCK_SIZE, progress=None):
+    """Description: Feed a binary file or stream to hash objects using a single reusable buffer.
+    Args:
+        - file | Blocking binary file object. Streams without readinto fall back to read.
+        - hashes | Iterable of hashlib objects
+        - block_size | Number of bytes read per call
+        - progress | Optional callback(bytes_processed, elapsed_seconds) called after every block
+
+    Returns:
+        - Number: the number of bytes read
+
+    """
+    hashes = list(hashes)
+    start = time.perf_counter()
+    if not hasattr(file, "readinto"):
+        total = 0
+        for bytes_blk in iter(lambda: file.read(block_size), b""):
+            for hash_obj in hashes:
+                hash_obj.update(bytes_blk)
+            total += len(bytes_blk)
+            if progress is not None:
+                progress(total, time.perf_counter() - start)
+        return total
+
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    total = 0
+    while True:
+        size = file.readinto(buffer)
+        if not size:
+            break
+        # slice the view instead of the buffer so the block is never copied
+        block = view[:size]
+        for hash_obj in hashes:
+            hash_obj.update(block)
+        total += size
+        if progress is not None:
+            progress(total, time.perf_counter() - start)
+    return total
+
+
+def update_from_mmap(file, hashes, block_size=DEFAULT_BLOCK_SIZE, progress=None):
+    """Description: Feed a regular file to hash objects through a read-only memory map.
+    Args:
+        - file | Binary file object backed by a regular file
+        - hashes | Iterable of hashlib objects
+        - block_size | Number of bytes hashed per update
+        - progress | Optional callback(bytes_processed, elapsed_seconds) called after every block
+
+    Returns:
+        - Number: the number of bytes read
+
+    """
+    hashes = list(hashes)
+    start = time.perf_counter()
+    size = os.fstat(file.fileno()).st_size
+    if size == 0:
+        # empty files cannot be mapped
+        return 0
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            for offset in range(0, size, block_size):
+                block = view[offset:offset + block_size]
+                for hash_obj in hashes:
+                    hash_obj.update(block)
+                # the map cannot be closed while a block still references it
+                block.release()
+                if progress is not None:
+                    progress(min(offset + block_size, size), time.perf_counter() - start)
+    return size
+
+
+def same_file_identity(before, after):
+    """Description: Check whether two os.stat results describe the same, unmodified file."""
+    return (before.st_dev, before.st_ino, before.st_size, before.st_mtime_ns) == \
+        (after.st_dev, after.st_ino, after.st_size, after.st_mtime_ns)
+
+
+class ProgressReporter:
+    """Progress callback that records throughput samples and prints them to stderr.
+
+    Pass an instance as the progress argument of the hashing calls. Every call is
+    kept in samples as (elapsed_seconds, bytes_processed) for graphing, and a status
+    line is printed at most once per interval.
+    """
+
+    def __init__(self, total=None, interval=1.0, stream=None):
+        self.total = total
+        self.interval = interval
+        self.stream = stream if stream is not None else sys.stderr
+        self.samples = []
+        self._last_print = None
+
+    def __call__(self, bytes_processed, elapsed):
+        self.samples.append((elapsed, bytes_processed))
+        finished = self.total is not None and bytes_processed >= self.total
+        if self._last_print is not None and elapsed - self._last_print < self.interval and not finished:
+            return
+        self._last_print = elapsed
+        rate = bytes_processed / elapsed / 1e6 if elapsed > 0 else 0.0
+        done = f"{bytes_processed / 1e6:,.1f} MB"
+        if self.total:
+            done += f" / {self.total / 1e6:,.1f} MB ({100 * bytes_processed / self.total:.0f}%)"
+        print(f"\r{done} at {rate:,.1f} MB/s", end="", file=self.stream, flush=True)
+
+    def close(self):
+        if self._last_print is not None:
+            print(file=self.stream)
+
+
+class MultiHasher:
+    """Incremental hash over several algorithms at once.
+
+    Feed data with update() as it arrives (from a pipe, socket or a download in
+    progress) and call finalize() once the stream ends.
+    """
+
+    def __init__(self, algorithms=SUPPORTED_ALGORITHMS):
+        self.hashes = {}
+        for algorithm in algorithms:
+            name = normalize_algorithm(algorithm)
+            self.hashes[name] = hashlib.new(name)
+        self.bytes_processed = 0
+
+    def update(self, chunk):
+        """Description: Feed the next chunk of data to every algorithm.
+        Args:
+            - chunk | bytes-like object
+
+        Returns:
+            - None
+
+        """
+        for hash_obj in self.hashes.values():
+            hash_obj.update(chunk)
+        self.bytes_processed += len(chunk)
+
+    def finalize(self):
+        """Description: Return the digests of everything fed so far.
+        Args:
+            - None
+
+        Returns:
+            - Dict: maps each algorithm name to its hex digest
+
+        """
+        return {name: hash_obj.hexdigest() for name, hash_obj in self.hashes.items()}
+
+
 class Hasher:
-    def __init__(self):
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE, use_mmap=False, cache=None):
         self.file_path = ""
         self.expected = ""
+        self.block_size = block_size
+        self.use_mmap = use_mmap
+        # optional DigestCache (see cache.py) consulted before reading the file
+        self.cache = cache
 
-    def get_sha1(self):
-        """Description: Calculate and return the SHA-1 hash.
+    def get_digests(self, algorithms=SUPPORTED_ALGORITHMS, progress=None):
+        """Description: Calculate several hashes of the specified file in a single read.
         Args:
-            - None
+            - algorithms | Iterable of algorithm names ("sha1", "sha256", "sha512", "md5")
+            - progress | Optional callback(bytes_processed, elapsed_seconds), not called for cached digests
 
         Returns:
-            - String: the SHA-1 hash of the specified file
+            - Dict: maps each requested algorithm name to the hex digest of the specified file
 
         Raises: 
             - Exceptions: 
                 - FileNotFoundError | Raises FileNotFound error when file path is invalid.
                 - FileNotSpecified | Raises custom FileNotSpecified error when the function is called before a file is specified.
+                - UnsupportedAlgorithm | Raises custom UnsupportedAlgorithm error when an algorithm is not supported.
 
         """
         if not self.file_path:
             raise FileNotSpecified("No file path specified.")
-        sha1 = hashlib.sha1()
-        with open(self.file_path, "rb") as file:
-            for bytes_blk in iter(lambda: file.read(4069), b""):
-                sha1.update(bytes_blk)
-        return sha1.hexdigest()
+        names = list(dict.fromkeys(normalize_algorithm(algorithm) for algorithm in algorithms))
+        digests = {}
+        with open(self.file_path, "rb", buffering=0) as file:
+            identity = os.fstat(file.fileno())
+            use_cache = self.cache is not None and stat.S_ISREG(identity.st_mode)
+            if use_cache:
+                for name in names:
+                    cached = self.cache.lookup(identity, name)
+                    if cached:
+                        digests[name] = cached
+
+            missing = [name for name in names if name not in digests]
+            if missing:
+                # every block is fed to all of the requested algorithms so the file is only read once
+                multi_hasher = MultiHasher(missing)
+                if self.use_mmap and stat.S_ISREG(identity.st_mode):
+                    update_from_mmap(file, [multi_hasher], self.block_size, progress)
+                else:
+                    update_from_file(file, [multi_hasher], self.block_size, progress)
+                digests.update(multi_hasher.finalize())
+                # only remember the digests if the file was not modified while it was being read
+                if use_cache and same_file_identity(identity, os.fstat(file.fileno())):
+                    for name in missing:
+                        self.cache.store(identity, name, digests[name])
+        return {name: digests[name] for name in names}
+
+    def hash_stream(self, fileobj, algorithms=SUPPORTED_ALGORITHMS, progress=None):
+        """Description: Calculate several hashes of a binary stream (stdin, socket, HTTP response...) as it is read.
+        Args:
+            - fileobj | Blocking binary file object, read until EOF. It is not closed.
+            - algorithms | Iterable of algorithm names ("sha1", "sha256", "sha512", "md5")
+            - progress | Optional callback(bytes_processed, elapsed_seconds)
+
+        Returns:
+            - Dict: maps each requested algorithm name to the hex digest of the stream
+
+        Raises: 
+            - Exceptions: 
+                - UnsupportedAlgorithm | Raises custom UnsupportedAlgorithm error when an algorithm is not supported.
+
+        """
+        multi_hasher = MultiHasher(algorithms)
+        update_from_file(fileobj, [multi_hasher], self.block_size, progress)
+        return multi_hasher.finalize()
+
+    def get_sha1(self, progress=None):
+        """Description: Calculate and return the SHA-1 hash.
+        Args:
+            - progress | Optional callback(bytes_processed, elapsed_seconds) called after every block
+
+        Returns:
+            - String: the SHA-1 hash of the specified file
 
+        Raises: 
+            - Exceptions: 
+                - FileNotFoundError | Raises FileNotFound error when file path is invalid.
+                - FileNotSpecified | Raises custom FileNotSpecified error when the function is called before a file is specified.
 
-    def get_sha256(self):
+        """
+        return self.get_digests(["sha1"], progress)["sha1"]
+
+
+    def get_sha256(self, progress=None):
         """Description: Calculate and return the SHA-256 hash.
         Args:
-            - None
+            - progress | Optional callback(bytes_processed, elapsed_seconds) called after every block
 
         Returns:
             - String: the SHA-256 hash of the specified file
@@ -50,18 +307,12 @@ class Hasher:
                 - FileNotSpecified | Raises custom FileNotSpecified error when the function is called before a file is specified.
 
         """
-        if not self.file_path:
-            raise FileNotSpecified("No file path specified.")
-        sha256 = hashlib.sha256()
-        with open(self.file_path, "rb") as file:
-            for bytes_blk in iter(lambda: file.read(4069), b""):
-                sha256.update(bytes_blk)
-        return sha256.hexdigest()
+        return self.get_digests(["sha256"], progress)["sha256"]
     
-    def get_sha512(self):
+    def get_sha512(self, progress=None):
         """Description: Calculate and return the SHA-512 hash.
         Args:
-            - None
+            - progress | Optional callback(bytes_processed, elapsed_seconds) called after every block
 
         Returns:
             - String: the SHA-512 hash of the specified file
@@ -72,19 +323,13 @@ class Hasher:
                 - FileNotSpecified | Raises custom FileNotSpecified error when the function is called before a file is specified.
 
         """
-        if not self.file_path:
-            raise FileNotSpecified("No file path specified.")
-        sha512 = hashlib.sha512()
-        with open(self.file_path, "rb") as file:
-            for bytes_blk in iter(lambda: file.read(4096), b""):
-                sha512.update(bytes_blk)
-        return sha512.hexdigest()
+        return self.get_digests(["sha512"], progress)["sha512"]
     
 
-    def get_md5(self):
+    def get_md5(self, progress=None):
         """Description: Calculate and return MD5 hash.
         Args:
-            - None
+            - progress | Optional callback(bytes_processed, elapsed_seconds) called after every block
 
         Returns:
             - String: the MD5 hash of the specified file
@@ -95,13 +340,7 @@ class Hasher:
                 - FileNotSpecified | Raises custom FileNotSpecified error when the function is called before a file is specified.
 
         """
-        if not self.file_path:
-            raise FileNotSpecified("No file path specified.")
-        md5 = hashlib.md5()
-        with open(self.file_path, "rb") as file:
-            for bytes_blk in iter(lambda: file.read(4096), b""):
-                md5.update(bytes_blk)
-        return md5.hexdigest()
+        return self.get_digests(["md5"], progress)["md5"]
 
 
 # clear the console to make it look pretty
@@ -184,7 +423,7 @@ def print_sha_menu(warn = False, custom_message = ""):
         return print_main_menu(True, "Please select a number from 1 to 3")
 
 # main prog loop
-def main():
+def interactive_main():
     running = True
     while running: 
         menu_id = print_main_menu()
@@ -215,7 +454,7 @@ def main():
                 hash = request.get_sha512()
 
             print(f"Provided hashes. Expected: {request.expected}. Calculated: {hash}.")
-            if (request.expected == hash):
+            if digests_match(request.expected, hash):
                 print(f"{GREEN}The provided hash matches the calculated hash.{RESET}")
             else:
                 print(f"{RED}The provided hash does NOT match the expected hash.{RESET}")
@@ -229,7 +468,7 @@ def main():
             hash = request.get_md5()
 
             print(f"Provided hashes. Expected: {request.expected}. Calculated: {hash}.")
-            if (request.expected == hash):
+            if digests_match(request.expected, hash):
                 print(f"{GREEN}The provided hash matches the calculated hash.{RESET}")
             else:
                 print(f"{RED}The provided hash does NOT match the expected hash.{RESET}")
@@ -239,5 +478,81 @@ def main():
             running = False
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Calculate and verify file hashes. Runs interactively when no options are given.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("-c", "--check", metavar="MANIFEST", help="verify the files listed in a sha256sum/md5sum style manifest")
+    mode.add_argument("-d", "--dir", metavar="DIRECTORY", help="hash every file below a directory and print a manifest")
+    mode.add_argument("--stdin", action="store_true", help="hash data piped to standard input as it arrives")
+    mode.add_argument("--tree", metavar="FILE", help="tree hash a large file in parallel chunks and write FILE.tree.json")
+    mode.add_argument("--check-tree", metavar="SIDECAR", help="re-hash the chunks of the file described by a .tree.json sidecar")
+    mode.add_argument("--snapshot", metavar="DIRECTORY", help="hash a directory tree into a JSON manifest with a root digest, re-hashing only changed files")
+    mode.add_argument("--serve", action="store_true", help="run a local hashing daemon answering GET /digest?path=...&algorithm=...")
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024 * 1024, help="chunk size in bytes for --tree")
+    parser.add_argument("--fail-fast", action="store_true", help="for --check-tree, read chunks in order and stop at the first mismatch")
+    parser.add_argument("--range", action="append", metavar="START:END", help="only check chunks overlapping this byte range (repeatable)")
+    parser.add_argument("--manifest", metavar="PATH", help="manifest for --snapshot (default: DIRECTORY/.hashchecker.json)")
+    parser.add_argument("--full", action="store_true", help="re-hash every file for --snapshot even if its size and mtime are unchanged")
+    parser.add_argument("--host", default="127.0.0.1", help="address for --serve to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port for --serve")
+    parser.add_argument("--socket", metavar="PATH", help="listen on a Unix socket instead of TCP for --serve")
+    parser.add_argument("-e", "--expected", metavar="DIGEST", help="expected digest for --stdin")
+    parser.add_argument("-a", "--algorithm", choices=SUPPORTED_ALGORITHMS, help="hash algorithm (inferred from digest length for --check, sha256 for --dir)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of hashing threads (default: number of CPUs)")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="read block size in bytes")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print failures and the summary")
+    parser.add_argument("--progress", action="store_true", help="print bytes processed and throughput to stderr for --stdin")
+    parser.add_argument("--cache", metavar="PATH", default=None, help="digest cache database (default: per-user cache directory)")
+    parser.add_argument("--cache-max-entries", type=int, default=100000, help="evict least recently used digests beyond this many entries")
+    parser.add_argument("--no-cache", action="store_true", help="always re-read every file, ignoring and not updating the digest cache")
+    return parser.parse_args(argv)
+
+
+def stdin_main(args):
+    """Description: Hash standard input without spooling it to disk, optionally comparing with an expected digest.
+    Args:
+        - args | argparse.Namespace
+
+    Returns:
+        - Number: process exit status, 1 when the digest does not match the expected digest
+
+    """
+    algorithm = args.algorithm or "sha256"
+    request = Hasher(block_size=args.block_size)
+    progress = ProgressReporter() if args.progress else None
+    digest = request.hash_stream(sys.stdin.buffer, [algorithm], progress)[algorithm]
+    if progress is not None:
+        progress.close()
+    print(f"{digest}  -")
+    if not args.expected:
+        return 0
+    if digests_match(args.expected, digest):
+        print(f"{GREEN}The provided hash matches the calculated hash.{RESET}", file=sys.stderr)
+        return 0
+    print(f"{RED}The provided hash does NOT match the expected hash.{RESET}", file=sys.stderr)
+    return 1
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.stdin:
+        return stdin_main(args)
+    if args.serve:
+        from service import service_main
+        return service_main(args)
+    if args.snapshot:
+        from snapshot import snapshot_main
+        return snapshot_main(args)
+    if args.tree or args.check_tree:
+        from tree import tree_main
+        return tree_main(args)
+    if args.check or args.dir:
+        # imported here because batch imports Hasher from this module
+        from batch import batch_main
+        return batch_main(args)
+    interactive_main()
+    return 0
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
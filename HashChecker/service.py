@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from checker import DEFAULT_BLOCK_SIZE, RED, RESET, FileNotSpecified, Hasher, UnsupportedAlgorithm, normalize_algorithm
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+MAX_REQUEST_LINE = 8192
+
+
+def _identify(file_path):
+    return os.path.realpath(file_path), os.stat(file_path)
+
+
+class HashService:
+    """Shared hashing engine for a long-lived local daemon.
+
+    Hashing runs on a bounded thread pool (hashlib releases the GIL on large
+    buffers) and concurrent requests for the same unchanged file and algorithm
+    share a single read.
+    """
+
+    def __init__(self, workers=None, block_size=DEFAULT_BLOCK_SIZE, cache=None):
+        self.block_size = block_size
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+        self._inflight = {}
+        self.requests = 0
+        self.deduplicated = 0
+
+    def _hash_file(self, file_path, algorithm):
+        request = Hasher(block_size=self.block_size, cache=self.cache)
+        request.file_path = file_path
+        return request.get_digests([algorithm])[algorithm]
+
+    async def digest(self, file_path, algorithm="sha256"):
+        """Description: Return the digest of a file, joining an in-flight computation for the same file if there is one.
+        Args:
+            - file_path | String
+            - algorithm | String
+
+        Returns:
+            - String: the hex digest
+
+        Raises:
+            - Exceptions:
+                - FileNotFoundError | Raises FileNotFound error when file path is invalid.
+                - FileNotSpecified | Raises custom FileNotSpecified error when no path is given.
+                - UnsupportedAlgorithm | Raises custom UnsupportedAlgorithm error when the algorithm is not supported.
+
+        """
+        if not file_path:
+            raise FileNotSpecified("No file path specified.")
+        algorithm = normalize_algorithm(algorithm)
+        self.requests += 1
+        loop = asyncio.get_running_loop()
+        # stat and realpath touch the disk, keep them off the event loop
+        real_path, identity = await loop.run_in_executor(self._pool, _identify, file_path)
+        # include the metadata so a file replaced mid-flight is not answered with the old digest
+        key = (real_path, identity.st_dev, identity.st_ino, identity.st_size, identity.st_mtime_ns, algorithm)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            future = loop.run_in_executor(self._pool, self._hash_file, file_path, algorithm)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield so one client disconnecting does not cancel the read for everybody else
+        return await asyncio.shield(future)
+
+    def stats(self):
+        return {"requests": self.requests, "deduplicated": self.deduplicated, "in_flight": len(self._inflight)}
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_request(self, method, target):
+        """Description: Route one HTTP request.
+        Args:
+            - method | String
+            - target | String, the request path and query
+
+        Returns:
+            - Tuple: (status code, JSON-serialisable body)
+
+        """
+        url = urlsplit(target)
+        if method != "GET":
+            return 405, {"error": "only GET is supported"}
+        if url.path == "/health":
+            return 200, {"status": "ok", **self.stats()}
+        if url.path != "/digest":
+            return 404, {"error": f"unknown endpoint {url.path}"}
+
+        query = parse_qs(url.query)
+        file_path = query.get("path", [""])[0]
+        algorithm = query.get("algorithm", ["sha256"])[0]
+        try:
+            digest = await self.digest(file_path, algorithm)
+        except (FileNotSpecified, UnsupportedAlgorithm, ValueError) as error:
+            # ValueError: paths the OS cannot take, e.g. with an embedded null byte
+            return 400, {"error": str(error)}
+        except FileNotFoundError as error:
+            return 404, {"error": error.strerror or str(error), "path": file_path}
+        except OSError as error:
+            return 500, {"error": error.strerror or str(error), "path": file_path}
+        return 200, {"path": file_path, "algorithm": normalize_algorithm(algorithm), "digest": digest}
+
+    async def handle_connection(self, reader, writer):
+        """Description: Serve a single HTTP/1.x request and close the connection."""
+        try:
+            try:
+                request_line = await reader.readline()
+                too_long = len(request_line) > MAX_REQUEST_LINE
+                if not too_long:
+                    # headers are not needed, but they must be consumed before replying
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+            except (ValueError, asyncio.LimitOverrunError):
+                # a line past the StreamReader limit makes readline raise instead of returning it
+                too_long = True
+            if too_long:
+                status, body = 400, {"error": "request line too long"}
+            else:
+                parts = request_line.decode("latin-1").split()
+                if len(parts) < 2:
+                    status, body = 400, {"error": "malformed request line"}
+                else:
+                    status, body = await self.handle_request(parts[0], parts[1])
+            payload = json.dumps(body).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + payload
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def start_server(service, host="127.0.0.1", port=8765, socket_path=None):
+    """Description: Start serving a HashService over a Unix socket when socket_path is given, otherwise over TCP."""
+    if socket_path:
+        return await asyncio.start_unix_server(service.handle_connection, path=socket_path)
+    return await asyncio.start_server(service.handle_connection, host, port)
+
+
+async def serve(service, host="127.0.0.1", port=8765, socket_path=None):
+    server = await start_server(service, host, port, socket_path)
+    address = socket_path or f"http://{host}:{server.sockets[0].getsockname()[1]}"
+    print(f"Hash service listening on {address}")
+    async with server:
+        await server.serve_forever()
+
+
+def service_main(args):
+    """Description: Run the hashing daemon from parsed command line arguments.
+    Args:
+        - args | argparse.Namespace
+
+    Returns:
+        - Number: process exit status
+
+    """
+    cache = None
+    if not args.no_cache:
+        from cache import DigestCache
+        cache = DigestCache(args.cache, args.cache_max_entries)
+    service = HashService(args.workers, args.block_size, cache)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+    except OSError as error:
+        print(f"{RED}{error}{RESET}", file=sys.stderr)
+        return 2
+    finally:
+        service.close()
+        if cache is not None:
+            cache.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
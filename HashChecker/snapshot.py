@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+from batch import ManifestEntry, list_files, run_batch
+from checker import DEFAULT_BLOCK_SIZE, GREEN, RED, RESET, UnsupportedAlgorithm, normalize_algorithm
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def root_digest(files, algorithm="sha256"):
+    """Description: Combine the digests of a directory tree into one deterministic root.
+
+    The root is the digest of the equivalent sha256sum style manifest text (sorted
+    "<digest>  <relative path>" lines), so it only depends on paths and contents.
+
+    Args:
+        - files | Dict mapping relative paths to entries with a "digest" key
+        - algorithm | String
+
+    Returns:
+        - String: the hex root digest
+
+    """
+    root = hashlib.new(algorithm)
+    for rel_path in sorted(files):
+        root.update(f"{files[rel_path]['digest']}  {rel_path}\n".encode("utf-8"))
+    return root.hexdigest()
+
+
+def read_snapshot(snapshot_path):
+    """Description: Load a snapshot manifest written by write_snapshot.
+    Args:
+        - snapshot_path | String
+
+    Returns:
+        - Dict: the snapshot
+
+    Raises:
+        - Exceptions:
+            - SnapshotError | Raises custom SnapshotError when the manifest is malformed or its root does not match.
+
+    """
+    with open(snapshot_path, "r", encoding="utf-8") as manifest:
+        try:
+            snapshot = json.load(manifest)
+        except ValueError as error:
+            raise SnapshotError(f"{snapshot_path}: {error}")
+    for key in ("algorithm", "root", "files"):
+        if key not in snapshot:
+            raise SnapshotError(f"{snapshot_path}: missing '{key}'")
+    if root_digest(snapshot["files"], snapshot["algorithm"]) != snapshot["root"]:
+        raise SnapshotError(f"{snapshot_path}: file digests do not match the root")
+    return snapshot
+
+
+def write_snapshot(snapshot, snapshot_path):
+    """Description: Save a snapshot manifest as JSON, replacing the previous one atomically."""
+    temp_path = snapshot_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as manifest:
+        json.dump(snapshot, manifest, indent=2, sort_keys=True)
+        manifest.write("\n")
+    os.replace(temp_path, snapshot_path)
+
+
+def snapshot_directory(directory, algorithm="sha256", previous=None, workers=None, block_size=DEFAULT_BLOCK_SIZE, cache=None, exclude=()):
+    """Description: Hash a directory tree, re-hashing only files whose size or mtime changed since the previous snapshot.
+    Args:
+        - directory | String
+        - algorithm | String
+        - previous | Dict returned by read_snapshot, optional. Ignored if it used another algorithm.
+        - workers | Number, optional
+        - block_size | Number
+        - cache | DigestCache, optional
+        - exclude | Iterable of absolute paths to leave out (e.g. the manifest itself)
+
+    Returns:
+        - Tuple: (snapshot dict, number of re-hashed files, list of BatchResult for unreadable files)
+
+    """
+    algorithm = normalize_algorithm(algorithm)
+    exclude = {os.path.abspath(path) for path in exclude}
+    previous_files = {}
+    if previous is not None and previous.get("algorithm") == algorithm:
+        previous_files = previous["files"]
+
+    files = {}
+    to_hash = []
+    for file_path in list_files(directory):
+        if os.path.abspath(file_path) in exclude:
+            continue
+        rel_path = os.path.relpath(file_path, directory).replace(os.sep, "/")
+        try:
+            identity = os.stat(file_path)
+        except OSError:
+            # vanished between listing and stat
+            continue
+        entry = {"size": identity.st_size, "mtime_ns": identity.st_mtime_ns}
+        old = previous_files.get(rel_path)
+        if old is not None and old["size"] == entry["size"] and old["mtime_ns"] == entry["mtime_ns"]:
+            entry["digest"] = old["digest"]
+        else:
+            to_hash.append((rel_path, ManifestEntry(file_path, "", algorithm)))
+        files[rel_path] = entry
+
+    errors = []
+    results = run_batch([manifest_entry for _, manifest_entry in to_hash], workers, block_size, cache)
+    for (rel_path, _), result in zip(to_hash, results):
+        if result.error:
+            errors.append(result)
+            del files[rel_path]
+        else:
+            files[rel_path]["digest"] = result.digest
+
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "algorithm": algorithm,
+        "root": root_digest(files, algorithm),
+        "files": files,
+    }
+    return snapshot, len(to_hash), errors
+
+
+def compare_snapshots(previous, current):
+    """Description: List the differences between two snapshots of the same tree.
+    Args:
+        - previous | Dict
+        - current | Dict
+
+    Returns:
+        - Dict: sorted "added", "removed" and "modified" relative paths
+
+    """
+    old_files = previous["files"] if previous else {}
+    new_files = current["files"]
+    return {
+        "added": sorted(set(new_files) - set(old_files)),
+        "removed": sorted(set(old_files) - set(new_files)),
+        "modified": sorted(path for path in set(old_files) & set(new_files) if old_files[path]["digest"] != new_files[path]["digest"]),
+    }
+
+
+def snapshot_main(args):
+    """Description: Snapshot a directory tree from parsed command line arguments and report what changed.
+    Args:
+        - args | argparse.Namespace
+
+    Returns:
+        - Number: process exit status, 0 when nothing changed, 1 when files changed or could not be read, 2 on bad input
+
+    """
+    manifest_path = args.manifest or os.path.join(args.snapshot, ".hashchecker.json")
+    cache = None
+    try:
+        previous = None
+        if os.path.exists(manifest_path):
+            previous = read_snapshot(manifest_path)
+        if not args.no_cache:
+            from cache import DigestCache
+            cache = DigestCache(args.cache, args.cache_max_entries)
+        algorithm = args.algorithm or (previous["algorithm"] if previous else "sha256")
+        snapshot, rehashed, errors = snapshot_directory(
+            args.snapshot, algorithm, None if args.full else previous, args.workers, args.block_size, cache, exclude=[manifest_path]
+        )
+        write_snapshot(snapshot, manifest_path)
+    except (SnapshotError, UnsupportedAlgorithm, OSError, sqlite3.Error) as error:
+        print(f"{RED}{error}{RESET}", file=sys.stderr)
+        return 2
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if previous is not None and previous["algorithm"] != snapshot["algorithm"]:
+        # digests of different algorithms cannot be compared, start a fresh baseline
+        previous = None
+    changes = compare_snapshots(previous, snapshot) if previous else {"added": [], "removed": [], "modified": []}
+    for label in ("added", "removed", "modified"):
+        for rel_path in changes[label]:
+            print(f"{RED}{label}: {rel_path}{RESET}")
+    for result in errors:
+        print(f"{RED}unreadable: {result.file_path} ({result.error}){RESET}")
+    total = len(snapshot["files"])
+    print(f"{total} files, {rehashed} hashed, {total - rehashed + len(errors)} unchanged since the last snapshot.")
+    print(f"{snapshot['algorithm']} root: {snapshot['root']} (manifest {manifest_path})")
+    if errors or any(changes.values()):
+        return 1
+    print(f"{GREEN}No changes since the last snapshot.{RESET}" if previous else f"{GREEN}Snapshot created.{RESET}")
+    return 0
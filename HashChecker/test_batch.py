@@ -0,0 +1,81 @@
+import hashlib
+import pytest
+
+from batch import ManifestError, parse_manifest, verify_manifest, hash_directory
+from checker import main
+
+# -----------------------------
+# Fixture to build a small artifact tree
+# -----------------------------
+@pytest.fixture
+def artifacts(tmp_path):
+    files = {"a.bin": b"alpha" * 1000, "nested/b.bin": b"bravo" * 1000, "c.txt": b""}
+    for name, data in files.items():
+        file_path = tmp_path / name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(data)
+    return tmp_path, files
+
+def write_manifest(directory, files, algorithm="sha256"):
+    lines = [f"{hashlib.new(algorithm, data).hexdigest()}  {name}" for name, data in files.items()]
+    manifest = directory / f"{algorithm}sums.txt"
+    manifest.write_text("\n".join(lines) + "\n")
+    return manifest
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_parse_manifest_infers_algorithm(artifacts):
+    directory, files = artifacts
+    entries = parse_manifest(str(write_manifest(directory, files, "md5")))
+    assert [entry.algorithm for entry in entries] == ["md5"] * len(files)
+
+def test_parse_manifest_binary_marker(tmp_path):
+    manifest = tmp_path / "sums.txt"
+    manifest.write_text(f"{'0' * 40} *file name.iso\n")
+    entry, = parse_manifest(str(manifest))
+    assert entry.algorithm == "sha1"
+    assert entry.file_path.endswith("file name.iso")
+
+def test_parse_manifest_rejects_garbage(tmp_path):
+    manifest = tmp_path / "sums.txt"
+    manifest.write_text("not a manifest line\n")
+    with pytest.raises(ManifestError):
+        parse_manifest(str(manifest))
+
+def test_verify_manifest(artifacts):
+    directory, files = artifacts
+    results = verify_manifest(str(write_manifest(directory, files)), workers=2)
+    assert all(result.ok for result in results)
+
+def test_verify_manifest_reports_failures(artifacts):
+    directory, files = artifacts
+    manifest = write_manifest(directory, files)
+    (directory / "a.bin").write_bytes(b"tampered")
+    (directory / "c.txt").unlink()
+    results = {result.file_path.rsplit("/", 1)[-1]: result for result in verify_manifest(str(manifest))}
+    assert not results["a.bin"].ok and not results["a.bin"].error
+    assert results["c.txt"].error
+    assert results["b.bin"].ok
+
+def test_hash_directory(artifacts):
+    directory, files = artifacts
+    results = hash_directory(str(directory), "sha1")
+    assert len(results) == len(files)
+    assert all(result.digest for result in results)
+
+def test_main_exit_status(artifacts, capsys):
+    directory, files = artifacts
+    manifest = write_manifest(directory, files)
+    cache = str(directory / "cache.sqlite3")
+    assert main(["--check", str(manifest), "--quiet", "--cache", cache]) == 0
+    (directory / "a.bin").write_bytes(b"tampered")
+    assert main(["--check", str(manifest), "--no-cache"]) == 1
+    assert "2 passed, 1 failed" in capsys.readouterr().out
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
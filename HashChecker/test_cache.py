@@ -0,0 +1,95 @@
+import hashlib
+import os
+import pytest
+
+from cache import DigestCache
+from checker import Hasher
+
+# -----------------------------
+# Fixtures
+# -----------------------------
+@pytest.fixture
+def cache(tmp_path):
+    with DigestCache(str(tmp_path / "digests.sqlite3"), max_entries=3) as digest_cache:
+        yield digest_cache
+
+@pytest.fixture
+def sample(tmp_path):
+    file_path = tmp_path / "sample.bin"
+    file_path.write_bytes(b"cached" * 1000)
+    return file_path
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_digest_is_cached(cache, sample):
+    request = Hasher(cache=cache)
+    request.file_path = str(sample)
+    expected = hashlib.sha256(sample.read_bytes()).hexdigest()
+    assert request.get_sha256() == expected
+    assert cache.lookup(os.stat(sample), "sha256") == expected
+
+def test_cached_digest_skips_read(cache, sample):
+    identity = os.stat(sample)
+    cache.store(identity, "md5", "from-cache")
+    request = Hasher(cache=cache)
+    request.file_path = str(sample)
+    assert request.get_md5() == "from-cache"
+
+def test_modified_file_is_rehashed(cache, sample):
+    request = Hasher(cache=cache)
+    request.file_path = str(sample)
+    request.get_sha1()
+    sample.write_bytes(b"changed")
+    assert request.get_sha1() == hashlib.sha1(b"changed").hexdigest()
+    assert len(cache) == 1
+
+def test_eviction_is_bounded(cache, tmp_path):
+    for index in range(5):
+        file_path = tmp_path / f"file{index}.bin"
+        file_path.write_bytes(bytes([index]))
+        cache.store(os.stat(file_path), "sha256", str(index))
+    assert len(cache) == 3
+
+def test_lookup_does_not_write(cache, sample):
+    identity = os.stat(sample)
+    cache.store(identity, "sha256", "digest")
+    changes = cache._connection.total_changes
+    for _ in range(10):
+        assert cache.lookup(identity, "sha256") == "digest"
+    assert cache._connection.total_changes == changes
+
+def test_hits_are_remembered_on_close(tmp_path):
+    path = str(tmp_path / "digests.sqlite3")
+    files = []
+    for index in range(3):
+        files.append(tmp_path / f"file{index}.bin")
+        files[-1].write_bytes(bytes([index]))
+    with DigestCache(path, max_entries=2) as digest_cache:
+        for index, file_path in enumerate(files[:2]):
+            digest_cache.store(os.stat(file_path), "sha256", str(index))
+        # file0 becomes the most recently used entry once its hit is written back
+        assert digest_cache.lookup(os.stat(files[0]), "sha256") == "0"
+    with DigestCache(path, max_entries=2) as digest_cache:
+        digest_cache.store(os.stat(files[2]), "sha256", "2")
+        assert digest_cache.lookup(os.stat(files[0]), "sha256") == "0"
+        assert digest_cache.lookup(os.stat(files[1]), "sha256") is None
+
+def test_eviction_runs_periodically(tmp_path):
+    with DigestCache(str(tmp_path / "digests.sqlite3"), max_entries=20) as digest_cache:
+        for index in range(21):
+            file_path = tmp_path / f"file{index}.bin"
+            file_path.write_bytes(bytes([index]))
+            digest_cache.store(os.stat(file_path), "sha256", str(index))
+        # trimmed every 2 stores, so at most one entry over the bound in between
+        assert len(digest_cache) == 21
+        file_path.write_bytes(b"changed")
+        digest_cache.store(os.stat(file_path), "sha256", "changed")
+        assert len(digest_cache) == 20
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
@@ -0,0 +1,117 @@
+import hashlib
+import io
+import pytest
+
+from checker import Hasher, MultiHasher, digests_match, ProgressReporter, FileNotSpecified, UnsupportedAlgorithm
+
+payload = b"ArkenShazon" * 5000
+
+# -----------------------------
+# Fixture to write a sample file
+# -----------------------------
+@pytest.fixture
+def hasher(tmp_path):
+    file_path = tmp_path / "sample.bin"
+    file_path.write_bytes(payload)
+    request = Hasher()
+    request.file_path = str(file_path)
+    return request
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_single_algorithms(hasher):
+    assert hasher.get_sha1() == hashlib.sha1(payload).hexdigest()
+    assert hasher.get_sha256() == hashlib.sha256(payload).hexdigest()
+    assert hasher.get_sha512() == hashlib.sha512(payload).hexdigest()
+    assert hasher.get_md5() == hashlib.md5(payload).hexdigest()
+
+def test_get_digests(hasher):
+    digests = hasher.get_digests(["SHA-256", "md5"])
+    assert digests == {
+        "sha256": hashlib.sha256(payload).hexdigest(),
+        "md5": hashlib.md5(payload).hexdigest(),
+    }
+
+def test_get_digests_defaults_to_all(hasher):
+    assert set(hasher.get_digests()) == {"sha1", "sha256", "sha512", "md5"}
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+@pytest.mark.parametrize("block_size", [1, 4096, 1024 * 1024])
+def test_read_strategies(hasher, use_mmap, block_size):
+    hasher.use_mmap = use_mmap
+    hasher.block_size = block_size
+    assert hasher.get_sha256() == hashlib.sha256(payload).hexdigest()
+
+def test_empty_file_mmap(tmp_path):
+    file_path = tmp_path / "empty.bin"
+    file_path.write_bytes(b"")
+    request = Hasher(use_mmap=True)
+    request.file_path = str(file_path)
+    assert request.get_md5() == hashlib.md5(b"").hexdigest()
+
+def test_hash_stream():
+    stream = io.BytesIO(payload)
+    digests = Hasher(block_size=1000).hash_stream(stream, ["sha512", "md5"])
+    assert digests == {
+        "sha512": hashlib.sha512(payload).hexdigest(),
+        "md5": hashlib.md5(payload).hexdigest(),
+    }
+
+class ReadOnlyStream:
+    """A stream without readinto, like some socket and HTTP wrappers."""
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self.data.read(size)
+
+def test_hash_stream_without_readinto():
+    digests = Hasher(block_size=333).hash_stream(ReadOnlyStream(payload), ["sha1"])
+    assert digests["sha1"] == hashlib.sha1(payload).hexdigest()
+
+def test_multi_hasher_incremental():
+    multi_hasher = MultiHasher()
+    for offset in range(0, len(payload), 777):
+        multi_hasher.update(payload[offset:offset + 777])
+    assert multi_hasher.bytes_processed == len(payload)
+    assert multi_hasher.finalize()["sha256"] == hashlib.sha256(payload).hexdigest()
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_progress_callback(hasher, use_mmap):
+    hasher.use_mmap = use_mmap
+    hasher.block_size = 10000
+    calls = []
+    hasher.get_sha1(lambda done, elapsed: calls.append((done, elapsed)))
+    assert [done for done, _ in calls] == [10000, 20000, 30000, 40000, 50000, 55000]
+    assert all(elapsed >= 0 for _, elapsed in calls)
+
+def test_progress_reporter(hasher):
+    stream = io.StringIO()
+    reporter = ProgressReporter(total=len(payload), interval=60, stream=stream)
+    hasher.block_size = 5000
+    hasher.get_md5(reporter)
+    reporter.close()
+    assert reporter.samples[-1][1] == len(payload)
+    assert "(100%)" in stream.getvalue()
+
+def test_digests_match():
+    digest = hashlib.md5(payload).hexdigest()
+    assert digests_match(f" {digest.upper()} ", digest)
+    assert not digests_match(digest[:-1] + "0", digest)
+    assert not digests_match("caf\u00e9", digest)
+
+def test_unsupported_algorithm(hasher):
+    with pytest.raises(UnsupportedAlgorithm):
+        hasher.get_digests(["crc32"])
+
+def test_file_not_specified():
+    with pytest.raises(FileNotSpecified):
+        Hasher().get_digests(["sha1"])
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
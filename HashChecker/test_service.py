@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import json
+import threading
+import pytest
+
+from service import HashService, start_server
+
+payload = b"daemon" * 20000
+
+# -----------------------------
+# Helpers
+# -----------------------------
+async def get(port, target):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+async def with_server(service, client):
+    server = await start_server(service, port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await client(port)
+    finally:
+        server.close()
+        await server.wait_closed()
+        service.close()
+
+@pytest.fixture
+def sample(tmp_path):
+    file_path = tmp_path / "artifact.bin"
+    file_path.write_bytes(payload)
+    return str(file_path)
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_digest_endpoint(sample):
+    async def client(port):
+        return await get(port, f"/digest?path={sample}&algorithm=SHA-512")
+    status, body = asyncio.run(with_server(HashService(workers=2), client))
+    assert status == 200
+    assert body["digest"] == hashlib.sha512(payload).hexdigest()
+
+def test_errors(sample):
+    async def client(port):
+        return [
+            await get(port, f"/digest?path={sample}&algorithm=crc32"),
+            await get(port, "/digest?path=/does/not/exist"),
+            await get(port, "/nowhere"),
+            await get(port, "/digest?path=%00"),
+        ]
+    statuses = [status for status, _ in asyncio.run(with_server(HashService(), client))]
+    assert statuses == [400, 404, 404, 400]
+
+def test_oversized_request_line(sample):
+    async def client(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /" + b"a" * 100000 + b" HTTP/1.1\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return int(response.split()[1])
+    assert asyncio.run(with_server(HashService(), client)) == 400
+
+def test_concurrent_requests_are_deduplicated(sample):
+    service = HashService(workers=4)
+    release = threading.Event()
+    calls = []
+    original = service._hash_file
+
+    def slow_hash(file_path, algorithm):
+        calls.append(file_path)
+        release.wait(5)
+        return original(file_path, algorithm)
+    service._hash_file = slow_hash
+
+    async def run():
+        tasks = [asyncio.ensure_future(service.digest(sample)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    digests = asyncio.run(run())
+    service.close()
+    assert len(calls) == 1
+    assert set(digests) == {hashlib.sha256(payload).hexdigest()}
+    assert service.stats()["deduplicated"] == 4
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
@@ -0,0 +1,71 @@
+import hashlib
+import os
+import pytest
+
+from checker import main
+from snapshot import SnapshotError, read_snapshot, root_digest, snapshot_directory, write_snapshot
+
+# -----------------------------
+# Fixture to build a small artifact store
+# -----------------------------
+@pytest.fixture
+def store(tmp_path):
+    directory = tmp_path / "store"
+    for name, data in {"a.bin": b"alpha", "sub/b.bin": b"bravo", "sub/deeper/c.bin": b"charlie"}.items():
+        file_path = directory / name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(data)
+    return directory
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_snapshot_contents(store):
+    snapshot, rehashed, errors = snapshot_directory(str(store))
+    assert rehashed == 3 and not errors
+    assert sorted(snapshot["files"]) == ["a.bin", "sub/b.bin", "sub/deeper/c.bin"]
+    assert snapshot["files"]["a.bin"]["digest"] == hashlib.sha256(b"alpha").hexdigest()
+
+def test_root_is_deterministic(store, tmp_path):
+    first, _, _ = snapshot_directory(str(store))
+    os.utime(store / "a.bin", ns=(1, 1))
+    second, _, _ = snapshot_directory(str(store), previous=first)
+    assert first["root"] == second["root"]
+    assert root_digest({"x": {"digest": "00"}}) != root_digest({"y": {"digest": "00"}})
+
+def test_only_changed_files_are_rehashed(store):
+    first, _, _ = snapshot_directory(str(store))
+    file_path = store / "sub" / "b.bin"
+    file_path.write_bytes(b"bravo!")
+    second, rehashed, _ = snapshot_directory(str(store), previous=first)
+    assert rehashed == 1
+    assert second["files"]["sub/b.bin"]["digest"] == hashlib.sha256(b"bravo!").hexdigest()
+    assert second["root"] != first["root"]
+
+def test_round_trip_detects_tampering(store, tmp_path):
+    manifest = str(tmp_path / "manifest.json")
+    write_snapshot(snapshot_directory(str(store))[0], manifest)
+    assert read_snapshot(manifest)["algorithm"] == "sha256"
+    with open(manifest) as file:
+        text = file.read()
+    with open(manifest, "w") as file:
+        file.write(text.replace(hashlib.sha256(b"alpha").hexdigest(), "0" * 64))
+    with pytest.raises(SnapshotError):
+        read_snapshot(manifest)
+
+def test_main_reports_changes(store, capsys):
+    assert main(["--snapshot", str(store), "--no-cache"]) == 0
+    assert (store / ".hashchecker.json").exists()
+    assert main(["--snapshot", str(store), "--no-cache"]) == 0
+    (store / "a.bin").unlink()
+    (store / "new.bin").write_bytes(b"new")
+    assert main(["--snapshot", str(store), "--no-cache"]) == 1
+    output = capsys.readouterr().out
+    assert "removed: a.bin" in output and "added: new.bin" in output
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
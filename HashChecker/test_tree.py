@@ -0,0 +1,169 @@
+import hashlib
+import pytest
+
+from tree import (chunks_for_range, first_mismatch, merkle_root, read_sidecar, SidecarError, SizeMismatch, tree_hash,
+                  verify_chunks, write_sidecar)
+from checker import main
+
+chunk_size = 1000
+payload = bytes(range(256)) * 40  # 10240 bytes -> 11 chunks
+
+# -----------------------------
+# Fixture to write a sample file
+# -----------------------------
+@pytest.fixture
+def sample(tmp_path):
+    file_path = tmp_path / "image.iso"
+    file_path.write_bytes(payload)
+    return file_path
+
+# -----------------------------
+# Tests
+# -----------------------------
+
+def test_tree_hash_chunks(sample):
+    tree = tree_hash(str(sample), chunk_size, workers=2)
+    assert len(tree["chunks"]) == 11
+    assert tree["chunks"][0] == hashlib.sha256(payload[:chunk_size]).hexdigest()
+    assert tree["chunks"][-1] == hashlib.sha256(payload[10 * chunk_size:]).hexdigest()
+    assert tree["root"] == merkle_root(tree["chunks"])
+
+def test_merkle_root_single_and_empty():
+    digest = hashlib.sha256(b"x").hexdigest()
+    assert merkle_root([digest]) == hashlib.sha256(b"\x00" + bytes.fromhex(digest)).hexdigest()
+    assert merkle_root([]) == hashlib.sha256(b"").hexdigest()
+
+def test_merkle_root_leaf_cannot_pose_as_interior_node(tmp_path):
+    original = tmp_path / "original"
+    original.write_bytes(bytes(range(200)))
+    tree = tree_hash(str(original), 100, workers=1)
+    # a chunk holding 0x01 || left || right used to hash to the same value as the interior node
+    forged = tmp_path / "forged"
+    forged.write_bytes(b"\x01" + bytes.fromhex(tree["chunks"][0]) + bytes.fromhex(tree["chunks"][1]))
+    assert tree_hash(str(forged), 100, workers=1)["root"] != tree["root"]
+
+def test_chunk_size_must_be_positive(sample):
+    with pytest.raises(ValueError):
+        tree_hash(str(sample), 0)
+    assert main(["--tree", str(sample), "--chunk-size", "0"]) == 2
+
+def test_chunks_for_range():
+    assert chunks_for_range(0, 1000, chunk_size) == [0]
+    assert chunks_for_range(999, 1001, chunk_size) == [0, 1]
+    assert chunks_for_range(5, 5, chunk_size) == []
+
+def test_verify_localizes_corruption(sample):
+    tree = tree_hash(str(sample), chunk_size, workers=1)
+    corrupted = bytearray(payload)
+    corrupted[4321] ^= 0xFF
+    sample.write_bytes(bytes(corrupted))
+    assert verify_chunks(str(sample), tree, workers=2) == [4]
+    assert verify_chunks(str(sample), tree, indexes=[0, 1]) == []
+
+def test_verify_truncated_file(sample):
+    tree = tree_hash(str(sample), chunk_size, workers=1)
+    sample.write_bytes(payload[:2500])
+    with pytest.raises(SizeMismatch) as error:
+        verify_chunks(str(sample), tree)
+    assert (error.value.expected, error.value.actual) == (len(payload), 2500)
+
+def test_verify_file_grown_by_whole_chunk(tmp_path):
+    grown = tmp_path / "grown.bin"
+    grown.write_bytes(payload[:2 * chunk_size])
+    assert main(["--tree", str(grown), "--chunk-size", str(chunk_size)]) == 0
+    tree = read_sidecar(str(grown) + ".tree.json")
+    # every recorded chunk still matches, only the size gives the change away
+    grown.write_bytes(payload[:3 * chunk_size])
+    with pytest.raises(SizeMismatch):
+        verify_chunks(str(grown), tree)
+    with pytest.raises(SizeMismatch):
+        verify_chunks(str(grown), tree, indexes=[0])
+    assert main(["--check-tree", str(grown) + ".tree.json", "--workers", "1"]) == 1
+
+def test_verify_file_grown_from_empty(tmp_path):
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert main(["--tree", str(empty), "--chunk-size", str(chunk_size)]) == 0
+    sidecar = str(empty) + ".tree.json"
+    assert main(["--check-tree", sidecar]) == 0
+    empty.write_bytes(b"data")
+    assert main(["--check-tree", sidecar]) == 1
+
+def test_first_mismatch_stops_early(sample, monkeypatch):
+    tree = tree_hash(str(sample), chunk_size, workers=1)
+    assert first_mismatch(str(sample), tree) is None
+    corrupted = bytearray(payload)
+    corrupted[2500] ^= 0xFF
+    corrupted[7500] ^= 0xFF
+    sample.write_bytes(bytes(corrupted))
+    hashed = []
+    import tree as tree_module
+    original = tree_module._hash_open_range
+    def counting(file, offset, *args):
+        hashed.append(offset)
+        return original(file, offset, *args)
+    monkeypatch.setattr(tree_module, "_hash_open_range", counting)
+    assert first_mismatch(str(sample), tree) == 2
+    assert hashed == [0, 1000, 2000]
+
+def test_first_mismatch_on_size_change_reads_nothing(sample, monkeypatch):
+    tree = tree_hash(str(sample), chunk_size, workers=1)
+    import tree as tree_module
+    monkeypatch.setattr(tree_module, "_hash_open_range", None)
+    sample.write_bytes(payload + b"extra")
+    with pytest.raises(SizeMismatch):
+        first_mismatch(str(sample), tree)
+    with pytest.raises(SizeMismatch):
+        first_mismatch(str(sample), tree, indexes=[0])
+
+def test_fail_fast_on_file_grown_by_whole_chunk(tmp_path):
+    grown = tmp_path / "grown.bin"
+    grown.write_bytes(payload[:2 * chunk_size])
+    assert main(["--tree", str(grown), "--chunk-size", str(chunk_size)]) == 0
+    grown.write_bytes(payload[:4 * chunk_size])
+    assert main(["--check-tree", str(grown) + ".tree.json", "--fail-fast"]) == 1
+
+def test_sidecar_round_trip(sample, tmp_path):
+    sidecar = tmp_path / "image.iso.tree.json"
+    write_sidecar(tree_hash(str(sample), chunk_size), str(sidecar))
+    assert read_sidecar(str(sidecar))["size"] == len(payload)
+    sidecar.write_text(sidecar.read_text().replace('"root": "', '"root": "00'))
+    with pytest.raises(SidecarError):
+        read_sidecar(str(sidecar))
+
+def test_sidecar_rejects_old_version_and_bad_chunk_size(sample, tmp_path):
+    sidecar = tmp_path / "image.iso.tree.json"
+    write_sidecar(tree_hash(str(sample), chunk_size), str(sidecar))
+    text = sidecar.read_text()
+    sidecar.write_text(text.replace('"version": 2', '"version": 1'))
+    with pytest.raises(SidecarError):
+        read_sidecar(str(sidecar))
+    sidecar.write_text(text.replace(f'"chunk_size": {chunk_size}', '"chunk_size": 0'))
+    with pytest.raises(SidecarError):
+        read_sidecar(str(sidecar))
+
+def test_main_range_past_end_of_file(tmp_path):
+    small = tmp_path / "small.bin"
+    small.write_bytes(bytes(300))
+    assert main(["--tree", str(small), "--chunk-size", "100"]) == 0
+    sidecar = str(small) + ".tree.json"
+    assert main(["--check-tree", sidecar, "--range", "0:1000", "--workers", "1"]) == 0
+    assert main(["--check-tree", sidecar, "--range", "0:1000", "--fail-fast"]) == 0
+    assert main(["--check-tree", sidecar, "--range=-5:10"]) == 2
+
+def test_main_tree_modes(sample):
+    assert main(["--tree", str(sample), "--chunk-size", str(chunk_size)]) == 0
+    sidecar = str(sample) + ".tree.json"
+    assert main(["--check-tree", sidecar, "--workers", "1"]) == 0
+    corrupted = bytearray(payload)
+    corrupted[0] ^= 0xFF
+    sample.write_bytes(bytes(corrupted))
+    assert main(["--check-tree", sidecar, "--range", "2000:3000"]) == 0
+    assert main(["--check-tree", sidecar, "--range", "0:10"]) == 1
+    assert main(["--check-tree", sidecar, "--fail-fast"]) == 1
+
+# -----------------------------
+# Allow direct execution
+# -----------------------------
+if __name__ == "__main__":
+    pytest.main(["-v", "--tb=line", "-rN", __file__])
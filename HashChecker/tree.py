@@ -0,0 +1,320 @@
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from checker import DEFAULT_BLOCK_SIZE, GREEN, RED, RESET, UnsupportedAlgorithm, digests_match, normalize_algorithm
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024  # 64 MiB
+SIDECAR_SUFFIX = ".tree.json"
+SIDECAR_VERSION = 2  # 2: leaves prefixed with 0x00 in merkle_root
+
+
+class SidecarError(Exception):
+    pass
+
+
+class SizeMismatch(Exception):
+    def __init__(self, file_path, expected, actual):
+        super().__init__(f"{file_path} is {actual} bytes, the sidecar recorded {expected}")
+        self.expected = expected
+        self.actual = actual
+
+
+def hash_range(file_path, offset, length, algorithm="sha256", block_size=DEFAULT_BLOCK_SIZE):
+    """Description: Hash length bytes of a file starting at offset.
+    Args:
+        - file_path | String
+        - offset | Number
+        - length | Number
+        - algorithm | String
+        - block_size | Number
+
+    Returns:
+        - String: the hex digest of the range (shorter if the file ends first)
+
+    """
+    buffer = bytearray(max(1, min(block_size, length)))
+    with open(file_path, "rb", buffering=0) as file:
+        return _hash_open_range(file, offset, length, algorithm, buffer)
+
+
+def _hash_open_range(file, offset, length, algorithm, buffer):
+    hash_obj = hashlib.new(algorithm)
+    view = memoryview(buffer)
+    file.seek(offset)
+    remaining = length
+    while remaining:
+        size = file.readinto(view[:min(remaining, len(buffer))])
+        if not size:
+            break
+        hash_obj.update(view[:size])
+        remaining -= size
+    return hash_obj.hexdigest()
+
+
+def _hash_chunk(job):
+    # top level so it can be sent to worker processes
+    file_path, index, chunk_size, algorithm, block_size = job
+    return hash_range(file_path, index * chunk_size, chunk_size, algorithm, block_size)
+
+
+def chunk_count(size, chunk_size):
+    """Description: Return the number of chunks a file of the given size splits into."""
+    if chunk_size <= 0:
+        raise ValueError("chunk size must be greater than 0")
+    return (size + chunk_size - 1) // chunk_size
+
+
+def chunks_for_range(start, end, chunk_size):
+    """Description: Return the indexes of the chunks overlapping the byte range [start, end)."""
+    if end <= start:
+        return []
+    return list(range(start // chunk_size, (end - 1) // chunk_size + 1))
+
+
+def merkle_root(chunk_digests, algorithm="sha256"):
+    """Description: Combine chunk digests into a single root digest.
+
+    Each chunk digest becomes a leaf H(0x00 || digest), then pairs of nodes are
+    hashed together level by level as H(0x01 || left || right) and an odd node is
+    carried up unchanged. The distinct prefixes keep a leaf from ever being
+    equal to an interior node, so a file made of one level's concatenated
+    digests cannot reproduce the root.
+
+    Args:
+        - chunk_digests | List of hex digests
+        - algorithm | String
+
+    Returns:
+        - String: the hex root digest (the digest of no data for an empty file)
+
+    """
+    if not chunk_digests:
+        return hashlib.new(algorithm).hexdigest()
+    level = [hashlib.new(algorithm, b"\x00" + bytes.fromhex(digest)).digest() for digest in chunk_digests]
+    while len(level) > 1:
+        next_level = []
+        for index in range(0, len(level) - 1, 2):
+            next_level.append(hashlib.new(algorithm, b"\x01" + level[index] + level[index + 1]).digest())
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0].hex()
+
+
+def hash_chunks(file_path, indexes, chunk_size, algorithm="sha256", workers=None, block_size=DEFAULT_BLOCK_SIZE):
+    """Description: Hash the given chunks of a file in parallel worker processes.
+    Args:
+        - file_path | String
+        - indexes | List of chunk indexes
+        - chunk_size | Number
+        - algorithm | String
+        - workers | Number of processes, defaults to the number of CPUs
+        - block_size | Number
+
+    Returns:
+        - Dict: maps each chunk index to its hex digest
+
+    """
+    jobs = [(file_path, index, chunk_size, algorithm, block_size) for index in indexes]
+    if len(jobs) <= 1 or workers == 1:
+        # not worth starting processes for a single chunk
+        return {job[1]: _hash_chunk(job) for job in jobs}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(indexes, pool.map(_hash_chunk, jobs)))
+
+
+def tree_hash(file_path, chunk_size=DEFAULT_CHUNK_SIZE, algorithm="sha256", workers=None, block_size=DEFAULT_BLOCK_SIZE):
+    """Description: Split a file into fixed-size chunks, hash them in parallel and combine them into a root.
+    Args:
+        - file_path | String
+        - chunk_size | Number
+        - algorithm | String
+        - workers | Number, optional
+        - block_size | Number
+
+    Returns:
+        - Dict: the sidecar contents (algorithm, chunk size, file size, chunk digests and root)
+
+    Raises:
+        - Exceptions:
+            - FileNotFoundError | Raises FileNotFound error when file path is invalid.
+            - UnsupportedAlgorithm | Raises custom UnsupportedAlgorithm error when the algorithm is not supported.
+
+    """
+    algorithm = normalize_algorithm(algorithm)
+    size = os.path.getsize(file_path)
+    indexes = list(range(chunk_count(size, chunk_size)))
+    digests = hash_chunks(file_path, indexes, chunk_size, algorithm, workers, block_size)
+    chunks = [digests[index] for index in indexes]
+    return {
+        "version": SIDECAR_VERSION,
+        "file": os.path.basename(file_path),
+        "algorithm": algorithm,
+        "chunk_size": chunk_size,
+        "size": size,
+        "chunks": chunks,
+        "root": merkle_root(chunks, algorithm),
+    }
+
+
+def write_sidecar(tree, sidecar_path):
+    """Description: Save tree hash results as JSON next to the file."""
+    with open(sidecar_path, "w", encoding="utf-8") as sidecar:
+        json.dump(tree, sidecar, indent=2)
+        sidecar.write("\n")
+
+
+def read_sidecar(sidecar_path):
+    """Description: Load and sanity check a sidecar written by write_sidecar.
+    Args:
+        - sidecar_path | String
+
+    Returns:
+        - Dict: the sidecar contents
+
+    Raises:
+        - Exceptions:
+            - SidecarError | Raises custom SidecarError when the sidecar is malformed.
+
+    """
+    with open(sidecar_path, "r", encoding="utf-8") as sidecar:
+        try:
+            tree = json.load(sidecar)
+        except ValueError as error:
+            raise SidecarError(f"{sidecar_path}: {error}")
+    for key in ("algorithm", "chunk_size", "size", "chunks", "root"):
+        if key not in tree:
+            raise SidecarError(f"{sidecar_path}: missing '{key}'")
+    if tree.get("version") != SIDECAR_VERSION:
+        raise SidecarError(f"{sidecar_path}: sidecar version {tree.get('version')} is not supported, "
+                           f"recreate it with --tree")
+    if not isinstance(tree["chunk_size"], int) or tree["chunk_size"] <= 0:
+        raise SidecarError(f"{sidecar_path}: chunk size must be a positive integer")
+    if len(tree["chunks"]) != chunk_count(tree["size"], tree["chunk_size"]):
+        raise SidecarError(f"{sidecar_path}: chunk count does not match file size")
+    if merkle_root(tree["chunks"], tree["algorithm"]) != tree["root"]:
+        raise SidecarError(f"{sidecar_path}: chunk digests do not match the root")
+    return tree
+
+
+def verify_chunks(file_path, tree, indexes=None, workers=None, block_size=DEFAULT_BLOCK_SIZE):
+    """Description: Re-hash chunks of a file and compare them with a sidecar.
+    Args:
+        - file_path | String
+        - tree | Dict returned by tree_hash or read_sidecar
+        - indexes | List of chunk indexes to check, defaults to every chunk
+        - workers | Number, optional
+        - block_size | Number
+
+    Returns:
+        - List: the indexes of the chunks that do not match, sorted
+
+    Raises:
+        - Exceptions:
+            - SizeMismatch | Raises custom SizeMismatch when the file size differs from the sidecar.
+
+    """
+    indexes = _checked_indexes(file_path, tree, indexes)
+    digests = hash_chunks(file_path, indexes, tree["chunk_size"], tree["algorithm"], workers, block_size)
+    return sorted(index for index, digest in digests.items() if not digests_match(tree["chunks"][index], digest))
+
+
+def first_mismatch(file_path, tree, indexes=None, block_size=DEFAULT_BLOCK_SIZE):
+    """Description: Check chunks in order and stop reading at the first one that does not match.
+
+    A file whose size differs from the sidecar raises SizeMismatch without being read, whichever
+    chunks are asked for.
+
+    Args:
+        - file_path | String
+        - tree | Dict returned by tree_hash or read_sidecar
+        - indexes | List of chunk indexes to check, defaults to every chunk
+        - block_size | Number
+
+    Returns:
+        - Number: the index of the mismatching chunk that was found, or None when every checked chunk matches
+
+    Raises:
+        - Exceptions:
+            - SizeMismatch | Raises custom SizeMismatch when the file size differs from the sidecar.
+
+    """
+    indexes = _checked_indexes(file_path, tree, indexes)
+    chunk_size = tree["chunk_size"]
+    buffer = bytearray(max(1, min(block_size, chunk_size)))
+    with open(file_path, "rb", buffering=0) as file:
+        for index in indexes:
+            digest = _hash_open_range(file, index * chunk_size, chunk_size, tree["algorithm"], buffer)
+            if not digests_match(tree["chunks"][index], digest):
+                return index
+    return None
+
+
+def _checked_indexes(file_path, tree, indexes):
+    # a grown or shrunk file fails as a whole: its chunks may all still match when the old
+    # size was a whole number of chunks, so the size is compared before any chunk is read
+    size = os.path.getsize(file_path)
+    if size != tree["size"]:
+        raise SizeMismatch(file_path, tree["size"], size)
+    if indexes is None:
+        return range(len(tree["chunks"]))
+    # ranges past the end of the recorded file have no chunks to compare
+    return sorted(set(index for index in indexes if 0 <= index < len(tree["chunks"])))
+
+
+def parse_range(text):
+    """Description: Parse a "START:END" byte range from the command line."""
+    start, _, end = text.partition(":")
+    start, end = int(start), int(end)
+    if start < 0 or end < 0:
+        raise ValueError(f"invalid range {text}: offsets must not be negative")
+    return start, end
+
+
+def tree_main(args):
+    """Description: Run the tree hash modes from parsed command line arguments.
+    Args:
+        - args | argparse.Namespace
+
+    Returns:
+        - Number: process exit status, 0 on success, 1 when chunks do not match, 2 on bad input
+
+    """
+    try:
+        if args.tree:
+            tree = tree_hash(args.tree, args.chunk_size, args.algorithm or "sha256", args.workers, args.block_size)
+            sidecar_path = args.tree + SIDECAR_SUFFIX
+            write_sidecar(tree, sidecar_path)
+            print(f"{tree['root']}  {args.tree} ({len(tree['chunks'])} chunks, sidecar {sidecar_path})")
+            return 0
+
+        tree = read_sidecar(args.check_tree)
+        file_path = os.path.join(os.path.dirname(os.path.abspath(args.check_tree)), tree["file"])
+        indexes = None
+        if args.range:
+            indexes = []
+            for text in args.range:
+                start, end = parse_range(text)
+                indexes.extend(chunks_for_range(start, end, tree["chunk_size"]))
+        if args.fail_fast:
+            index = first_mismatch(file_path, tree, indexes, args.block_size)
+            mismatched = [] if index is None else [index]
+        else:
+            mismatched = verify_chunks(file_path, tree, indexes, args.workers, args.block_size)
+    except SizeMismatch as error:
+        print(f"{RED}{error}{RESET}")
+        return 1
+    except (SidecarError, UnsupportedAlgorithm, OSError, ValueError) as error:
+        print(f"{RED}{error}{RESET}", file=sys.stderr)
+        return 2
+
+    if mismatched:
+        chunk_size = tree["chunk_size"]
+        for index in mismatched:
+            print(f"{RED}chunk {index} (bytes {index * chunk_size}-{(index + 1) * chunk_size - 1}) does NOT match{RESET}")
+        return 1
+    print(f"{GREEN}All checked chunks match.{RESET}")
+    return 0